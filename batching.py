@@ -0,0 +1,167 @@
+import asyncio
+import collections
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from inference import BATCH_SIZE
+
+# Most requests coalesced into one generate_batch() call
+MAX_BATCH_SIZE = BATCH_SIZE
+# How long the first request of a batch waits for more to arrive before the batch runs anyway
+MAX_WAIT_MS = 5.0
+# Recent requests/batches kept for the latency percentiles and batch fill in stats()
+METRICS_WINDOW = 10000
+
+# Nearest-rank percentile of an unsorted list, 0 for an empty one
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))]
+
+# Coalesces concurrent single requests into batches: a batch starts with the oldest waiting request
+# and closes when it holds max_batch_size requests or max_wait_ms have passed, whichever comes
+# first. Batches run one at a time on a worker thread, so the event loop keeps accepting requests
+# (which form the next batch) while the model is busy. Any generator with generate_batch() works.
+class MicroBatcher:
+    def __init__(self, generator, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.generator = generator
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="generate")
+        self.latencies = collections.deque(maxlen=METRICS_WINDOW)
+        self.batch_sizes = collections.deque(maxlen=METRICS_WINDOW)
+        self.requests = self.batches = self.errors = 0
+        self.closed = False
+
+    async def submit(self, input_text):
+        if self.closed:
+            raise RuntimeError("batcher closed")
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((input_text, future, time.perf_counter()))
+        return await future
+
+    async def generate_batch(self, input_texts):
+        return list(await asyncio.gather(*map(self.submit, input_texts)))
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                batch = [await self.queue.get()]
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    if self.queue.empty():
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                        except asyncio.TimeoutError:
+                            break
+                    else:
+                        batch.append(self.queue.get_nowait())
+                # Callers that gave up while waiting don't take a slot in the batch
+                batch = [request for request in batch if not request[1].done()]
+                if batch:
+                    await self.run_batch(loop, batch)
+        except asyncio.CancelledError:
+            # The batch being collected or run when the batcher is stopped won't get its results
+            self.fail(batch, RuntimeError("batcher closed"))
+            raise
+
+    async def run_batch(self, loop, batch):
+        try:
+            descriptions = await loop.run_in_executor(self.executor, self.generator.generate_batch, [text for text, _, _ in batch])
+        except Exception as error:
+            self.errors += len(batch)
+            self.fail(batch, error)
+            return
+        now = time.perf_counter()
+        self.batches += 1
+        self.requests += len(batch)
+        self.batch_sizes.append(len(batch))
+        for (_, future, submitted), description in zip(batch, descriptions):
+            self.latencies.append(now - submitted)
+            if not future.done():
+                future.set_result(description)
+
+    def fail(self, batch, error):
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    # Refuses new requests and fails the ones still queued, so no caller waits forever on shutdown
+    def close(self):
+        self.closed = True
+        queued = []
+        while not self.queue.empty():
+            queued.append(self.queue.get_nowait())
+        self.fail(queued, RuntimeError("batcher closed"))
+
+    # Latency is from submit() to the result, queueing included; batch fill is the mean batch size
+    # as a fraction of max_batch_size. Both cover the last METRICS_WINDOW requests/batches.
+    def stats(self):
+        latencies = list(self.latencies)
+        batch_sizes = list(self.batch_sizes)
+        mean_batch_size = sum(batch_sizes) / len(batch_sizes) if batch_sizes else 0.0
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "errors": self.errors,
+            "queued": self.queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "mean_batch_size": mean_batch_size,
+            "batch_fill": mean_batch_size / self.max_batch_size,
+            "latency_p50_ms": 1000 * percentile(latencies, 50),
+            "latency_p99_ms": 1000 * percentile(latencies, 99),
+        }
+
+# Runs a MicroBatcher on its own event loop in a daemon thread, for synchronous callers such as the
+# threaded HTTP server: generate()/generate_batch() block until the request's batch has run.
+class BackgroundBatcher:
+    def __init__(self, generator, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="batcher", daemon=True)
+        self.thread.start()
+        self.batcher = self.call(self.start, generator, max_batch_size, max_wait_ms)
+
+    # The batcher is created on the loop that runs it
+    async def start(self, generator, max_batch_size, max_wait_ms):
+        batcher = MicroBatcher(generator, max_batch_size, max_wait_ms)
+        self.task = asyncio.create_task(batcher.run())
+        return batcher
+
+    async def stop(self):
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.batcher.close()
+
+    async def read_stats(self):
+        return self.batcher.stats()
+
+    def call(self, function, *args):
+        return asyncio.run_coroutine_threadsafe(function(*args), self.loop).result()
+
+    def generate(self, input_text):
+        return self.call(self.batcher.submit, input_text)
+
+    def generate_batch(self, input_texts):
+        return self.call(self.batcher.generate_batch, input_texts)
+
+    def stats(self):
+        return self.call(self.read_stats)
+
+    def close(self):
+        self.call(self.stop)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.batcher.executor.shutdown()
+        self.loop.close()
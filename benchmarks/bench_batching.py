@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from batching import MAX_BATCH_SIZE, MAX_WAIT_MS, MicroBatcher
+from inference import DECODING_PRESETS, DEFAULT_DECODING, MODEL_NAME, DescriptionGenerator, decoding_options, default_model_path
+from train import validation_pairs
+
+# Each client sends its share of the tag strings one request at a time, like a caller of POST /generate
+async def run_clients(batcher, tags, clients):
+    async def client(share):
+        for text in share:
+            await batcher.submit(text)
+
+    worker = asyncio.create_task(batcher.run())
+    start = time.perf_counter()
+    await asyncio.gather(*(client(tags[i::clients]) for i in range(clients)))
+    seconds = time.perf_counter() - start
+    worker.cancel()
+    batcher.executor.shutdown()
+    return seconds
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput and latency of concurrent single requests with and without micro-batching")
+    parser.add_argument("--model-name", type=str, default=MODEL_NAME, help="Model name or local directory")
+    parser.add_argument("--weights", type=str, default=None, help="Fine-tuned weights (default: same as inference.py)")
+    parser.add_argument("--decoding", type=str, default=DEFAULT_DECODING, choices=list(DECODING_PRESETS))
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent callers")
+    parser.add_argument("--max-batch-sizes", type=int, nargs="+", default=[1, 4, MAX_BATCH_SIZE], help="1 is the unbatched baseline")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N validation examples")
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu")
+
+    args = parser.parse_args()
+    device = torch.device(args.device)
+
+    tags = [tags for tags, _ in validation_pairs()[:args.limit]]
+    decoding = decoding_options(args.decoding)
+    generator = DescriptionGenerator(model_name=args.model_name, model_path=args.weights or default_model_path(), device=device, decoding=decoding)
+    # Warm up kernels/allocator so the first configuration isn't penalized
+    generator.generate_batch(tags[:max(args.max_batch_sizes)])
+
+    print(f"{len(tags)} requests from {args.clients} clients, {args.decoding} decoding on {device}, max wait {args.max_wait_ms} ms")
+    print(f"{'max batch':>10}{'req/s':>9}{'p50 (ms)':>10}{'p99 (ms)':>10}{'mean batch':>12}{'fill':>7}")
+    for max_batch_size in args.max_batch_sizes:
+        batcher = MicroBatcher(generator, max_batch_size, args.max_wait_ms)
+        seconds = asyncio.run(run_clients(batcher, tags, args.clients))
+        stats = batcher.stats()
+        print(
+            f"{max_batch_size:>10}{len(tags) / seconds:>9.1f}{stats['latency_p50_ms']:>10.1f}{stats['latency_p99_ms']:>10.1f}"
+            f"{stats['mean_batch_size']:>12.1f}{stats['batch_fill']:>7.0%}"
+        )
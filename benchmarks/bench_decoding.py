@@ -0,0 +1,46 @@
+import argparse
+import os
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from inference import BATCH_SIZE, DECODING_PRESETS, MODEL_NAME, DescriptionGenerator, decoding_options, default_model_path
+from quality import mean_token_f1
+from train import validation_pairs
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency vs. quality of each decoding preset on the validation split")
+    parser.add_argument("--model-name", type=str, default=MODEL_NAME, help="Model name or local directory")
+    parser.add_argument("--weights", type=str, default=None, help="Fine-tuned weights (default: same as inference.py)")
+    parser.add_argument("--presets", type=str, nargs="+", default=list(DECODING_PRESETS), choices=list(DECODING_PRESETS))
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N validation examples")
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu")
+
+    args = parser.parse_args()
+    device = torch.device(args.device)
+
+    pairs = validation_pairs()[:args.limit]
+    tags = [tags for tags, _ in pairs]
+    references = [description for _, description in pairs]
+    generator = DescriptionGenerator(model_name=args.model_name, model_path=args.weights or default_model_path(), device=device)
+    # Warm up kernels/allocator so the first preset isn't penalized
+    generator.generate_batch(tags[:args.batch_size], args.batch_size, decoding=decoding_options("fast"))
+
+    print(f"{len(tags)} validation examples, batch size {args.batch_size} on {device}")
+    print(f"{'preset':<10}{'time (s)':>10}{'ms/example':>12}{'words':>7}{'token F1':>10}  options")
+    for preset in args.presets:
+        decoding = decoding_options(preset)
+        # Sampling presets draw from torch's RNG; seed it so runs are comparable
+        torch.manual_seed(0)
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        descriptions = generator.generate_batch(tags, args.batch_size, decoding=decoding)
+        if device.type == "cuda":
+            torch.cuda.synchronize()
+        seconds = time.perf_counter() - start
+        words = sum(len(description.split()) for description in descriptions) / len(descriptions)
+        print(f"{preset:<10}{seconds:>10.2f}{1000 * seconds / len(tags):>12.1f}{words:>7.1f}{mean_token_f1(descriptions, references):>10.3f}  {decoding}")
@@ -0,0 +1,49 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules that must not pull in torch/transformers/bitsandbytes at import time
+LIGHT_MODULES = ["corpus", "modeling", "train", "inference", "server", "onnx_backend", "cache", "normalize", "vocab", "batching", "pool", "step_timer"]
+# Modules that define torch Datasets and so import torch themselves
+TORCH_MODULES = ["dataset", "onnx_export", "shared_kv"]
+HEAVY_MODULES = ["torch", "transformers", "bitsandbytes"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+# Imports one module in a fresh interpreter and returns (best seconds over repeats, heavy modules loaded)
+def measure(module, repeats):
+    timings = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+    return min(timings), result["heavy"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import time of each module and check heavy dependencies stay lazy")
+    parser.add_argument("--repeats", type=int, default=3)
+
+    args = parser.parse_args()
+
+    leaks = []
+    print(f"{'module':<12}{'import (ms)':>12}  heavy modules loaded")
+    for module in LIGHT_MODULES + TORCH_MODULES:
+        seconds, heavy = measure(module, args.repeats)
+        print(f"{module:<12}{1000 * seconds:>12.1f}  {', '.join(heavy) or '-'}")
+        if module in LIGHT_MODULES and heavy:
+            leaks.append(module)
+
+    if leaks:
+        sys.exit(f"heavy modules imported eagerly by: {', '.join(leaks)}")
@@ -0,0 +1,229 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from batching import percentile
+from corpus import data
+from inference import DECODING_PRESETS, iter_batches
+from pool import available_cpus
+
+BACKENDS = ["torch", "shared_kv", "quantized", "onnx"]
+# Backends that decode with the numpy search loops, which don't sample
+NO_SAMPLING = {"shared_kv", "onnx"}
+REPORT_PATH = "inference_benchmark.json"
+
+# The first `requests` tag strings of the bundled corpus, in corpus order, repeated if more are asked for
+def workload(requests):
+    tags = [tags for tags, _ in data]
+    return list(itertools.islice(itertools.cycle(tags), requests))
+
+# Peak resident memory of this process in MB. Unlike ru_maxrss, which a child inherits from the process
+# that forked it, the high-water mark in /proc starts over when the interpreter is exec'd (Linux).
+def peak_rss_mb():
+    with open("/proc/self/status") as f:
+        fields = dict(line.split(":", 1) for line in f)
+    return int(fields["VmHWM"].split()[0]) / 1024
+
+def digest(strings):
+    return hashlib.sha1("\n".join(strings).encode("utf-8")).hexdigest()
+
+# Generator for one configuration; heavy imports happen here so they count towards the cold start
+def build_generator(config):
+    from inference import decoding_options
+
+    decoding = decoding_options(config["decoding"])
+    if config["backend"] == "onnx":
+        from onnx_backend import OnnxDescriptionGenerator
+
+        return OnnxDescriptionGenerator(config["onnx_dir"], decoding=decoding, threads=config["threads"])
+    if config["backend"] == "shared_kv":
+        from shared_kv import SharedKVDescriptionGenerator
+
+        return SharedKVDescriptionGenerator(model_path=config["weights"], model_name=config["model_name"], decoding=decoding)
+    import torch
+
+    from inference import DescriptionGenerator
+
+    quantized = config["backend"] == "quantized"
+    return DescriptionGenerator(
+        model_path=config["quantized_weights"] if quantized else config["weights"],
+        model_name=config["model_name"], device=torch.device("cpu"), quantized=quantized, decoding=decoding,
+    )
+
+# Runs in a fresh interpreter so cold start and peak RSS belong to this configuration alone. Every
+# request of a batch is answered when the batch is, so each gets the batch's latency.
+def run_config(config):
+    start = time.perf_counter()
+    import torch
+
+    torch.set_num_threads(config["threads"])
+    # Sampling presets draw from torch's RNG
+    torch.manual_seed(0)
+    generator = build_generator(config)
+    cold_start = time.perf_counter() - start
+
+    tags = workload(config["requests"])
+    start = time.perf_counter()
+    generator.generate_batch(tags[:config["batch_size"]], config["batch_size"])
+    first_batch = time.perf_counter() - start
+
+    latencies, descriptions = [], []
+    start = time.perf_counter()
+    for batch in iter_batches(tags, config["batch_size"]):
+        batch_start = time.perf_counter()
+        descriptions.extend(generator.generate_batch(batch, config["batch_size"]))
+        latencies.extend([time.perf_counter() - batch_start] * len(batch))
+    seconds = time.perf_counter() - start
+    return {
+        "cold_start_s": round(cold_start, 3),
+        "first_batch_s": round(first_batch, 3),
+        "latency_ms": {f"p{q}": round(1000 * percentile(latencies, q), 2) for q in (50, 95, 99)},
+        "throughput_rps": round(len(tags) / seconds, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "output_sha1": digest(descriptions),
+    }
+
+def environment():
+    import numpy
+    import torch
+    import transformers
+
+    try:
+        import onnxruntime
+
+        onnxruntime_version = onnxruntime.__version__
+    except ImportError:
+        onnxruntime_version = None
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    return {
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": available_cpus(),
+        "torch": torch.__version__,
+        "transformers": transformers.__version__,
+        "numpy": numpy.__version__,
+        "onnxruntime": onnxruntime_version,
+    }
+
+# Writes the int8 and ONNX exports the requested backends need; returns the backends that can't run
+def prepare_backends(backends, model_name, weights, work_dir):
+    skipped = {}
+    if "quantized" in backends:
+        from modeling import export_quantized
+
+        export_quantized(model_name, weights, os.path.join(work_dir, "model.int8.pt"))
+    if "onnx" in backends:
+        try:
+            from onnx_export import export_onnx
+
+            export_onnx(model_name, weights, os.path.join(work_dir, "onnx"))
+        except ImportError as error:
+            skipped["onnx"] = f"export needs onnx and onnxruntime ({error})"
+    return skipped
+
+def config_key(result):
+    return (result["backend"], result["decoding"], result["batch_size"], result["threads"])
+
+# Relative change of each configuration against an earlier report, e.g. from the previous commit
+def print_comparison(report, baseline):
+    before = {config_key(result): result for result in baseline["results"] if "skipped" not in result}
+    # Outputs can only match when both reports ran the same tag strings
+    same_workload = report["workload"]["sha1"] == baseline["workload"]["sha1"]
+    print(f"\nvs. {baseline['environment'].get('commit')}: throughput / p50 latency / peak RSS change, outputs")
+    for result in report["results"]:
+        old = before.get(config_key(result))
+        if old is None or "skipped" in result:
+            continue
+        changes = [
+            result["throughput_rps"] / old["throughput_rps"] - 1,
+            result["latency_ms"]["p50"] / old["latency_ms"]["p50"] - 1,
+            result["peak_rss_mb"] / old["peak_rss_mb"] - 1,
+        ]
+        outputs = "same" if result["output_sha1"] == old["output_sha1"] else "CHANGED"
+        if not same_workload:
+            outputs = "(different workload)"
+        print(f"{' '.join(map(str, config_key(result))):<32}" + "".join(f"{change:>+9.1%}" for change in changes) + f"  {outputs}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold start, latency percentiles, throughput and peak RSS of inference across backends and settings (CPU), as a JSON report")
+    parser.add_argument("--model-name", type=str, default=None, help="Model name or local directory (default: a tiny randomly initialised T5, no downloads)")
+    parser.add_argument("--weights", type=str, default=None, help="Weights for --model-name (.pth or .safetensors)")
+    parser.add_argument("--backends", type=str, nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--decoding", type=str, nargs="+", default=["fast", "quality"], choices=list(DECODING_PRESETS))
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--threads", type=int, nargs="+", default=None, help="torch/ONNX Runtime thread counts (default: 1 and all available cores)")
+    parser.add_argument("--requests", type=int, default=128, help="Tag strings in the workload, taken from the bundled corpus in order")
+    parser.add_argument("--output", type=str, default=REPORT_PATH, help="JSON report to write")
+    parser.add_argument("--baseline", type=str, default=None, help="Earlier report to compare against")
+    parser.add_argument("--run", type=str, default=None, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+    if args.run:
+        print(json.dumps(run_config(json.loads(args.run))))
+        sys.exit(0)
+    if (args.model_name is None) != (args.weights is None):
+        parser.error("pass --model-name and --weights together")
+    threads = args.threads or sorted({1, available_cpus()})
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        if args.model_name is None:
+            from tiny_model import TINY_CONFIG, make_tiny_model
+
+            model_name = os.path.join(work_dir, "tiny-t5")
+            weights = make_tiny_model(model_name)
+            model = {"name": "tiny random-init T5 (benchmarks/tiny_model.py, seed 0)", "config": TINY_CONFIG}
+        else:
+            model_name, weights = args.model_name, os.path.abspath(args.weights)
+            model = {"name": model_name, "weights": os.path.basename(weights)}
+        skipped = prepare_backends(args.backends, model_name, weights, work_dir)
+
+        results = []
+        for backend, decoding, batch_size, thread_count in itertools.product(args.backends, args.decoding, args.batch_sizes, threads):
+            result = {"backend": backend, "decoding": decoding, "batch_size": batch_size, "threads": thread_count}
+            if backend in skipped:
+                result["skipped"] = skipped[backend]
+            elif backend in NO_SAMPLING and DECODING_PRESETS[decoding].get("do_sample"):
+                result["skipped"] = "sampling is not supported"
+            else:
+                config = {
+                    **result, "requests": args.requests, "model_name": model_name, "weights": weights,
+                    "quantized_weights": os.path.join(work_dir, "model.int8.pt"), "onnx_dir": os.path.join(work_dir, "onnx"),
+                }
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--run", json.dumps(config)],
+                    cwd=ROOT, capture_output=True, text=True, check=True,
+                ).stdout
+                result.update(json.loads(output.strip().splitlines()[-1]))
+            results.append(result)
+            if "skipped" in result:
+                print(f"{backend:<10}{decoding:<9}batch {batch_size:<4}threads {thread_count:<4} skipped: {result['skipped']}")
+            else:
+                print(
+                    f"{backend:<10}{decoding:<9}batch {batch_size:<4}threads {thread_count:<4}"
+                    f"cold {result['cold_start_s']:>6.2f}s  p50 {result['latency_ms']['p50']:>8.1f}ms  p99 {result['latency_ms']['p99']:>8.1f}ms"
+                    f"  {result['throughput_rps']:>8.1f} req/s  {result['peak_rss_mb']:>6.0f} MB"
+                )
+
+    report = {
+        "environment": environment(),
+        "model": model,
+        "workload": {"requests": args.requests, "source": "corpus.data", "sha1": digest(workload(args.requests))},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Wrote {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            print_comparison(report, json.load(f))
@@ -0,0 +1,44 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from inference import MODEL_NAME, MODEL_PATH, SAFETENSORS_PATH
+
+PROBE = """
+import json, resource, time
+start = time.perf_counter()
+import torch
+from modeling import load_model
+model = load_model({model_name!r}, weights_path={weights_path!r}, device=torch.device("cpu"))
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+# Loads the model once in a fresh interpreter; returns (seconds including imports, peak RSS in MB)
+def measure(model_name, weights_path):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(model_name=model_name, weights_path=weights_path)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["seconds"], result["peak_rss_mb"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare cold-start time and peak RSS of .pth and safetensors loading")
+    parser.add_argument("--model-name", type=str, default=MODEL_NAME, help="Model name or local directory")
+    parser.add_argument("--pth", type=str, default=MODEL_PATH)
+    parser.add_argument("--safetensors", type=str, default=SAFETENSORS_PATH)
+    parser.add_argument("--repeats", type=int, default=3)
+
+    args = parser.parse_args()
+
+    print(f"{'weights':<40}{'cold start (s)':>16}{'peak RSS (MB)':>15}")
+    for weights_path in [args.pth, args.safetensors]:
+        runs = [measure(args.model_name, os.path.abspath(weights_path)) for _ in range(args.repeats)]
+        seconds = min(run[0] for run in runs)
+        peak_rss = min(run[1] for run in runs)
+        print(f"{os.path.basename(weights_path):<40}{seconds:>16.2f}{peak_rss:>15.0f}")
@@ -0,0 +1,83 @@
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from corpus import data
+from normalize import TagNormalizer
+
+# Corpus tag strings with the formatting noise seen in scraped data: case, underscores, spacing, repeats
+def noisy_tag_strings(count, seed=0):
+    rng = random.Random(seed)
+    tag_lists = [[tag.strip() for tag in tags.split(",")] for tags, _ in data]
+    strings = []
+    for _ in range(count):
+        tags = list(rng.choice(tag_lists))
+        rng.shuffle(tags)
+        if rng.random() < 0.3:
+            tags.append(rng.choice(tags))
+        tags = [tag.replace(" ", "_") if rng.random() < 0.3 else tag for tag in tags]
+        tags = [tag.upper() if rng.random() < 0.1 else tag for tag in tags]
+        strings.append(rng.choice([",", ", ", " , "]).join(tags))
+    return strings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of tag normalization, one string at a time vs. batched")
+    parser.add_argument("--count", type=int, default=1000000, help="Number of tag strings to normalize")
+    parser.add_argument("--batch-size", type=int, default=10000)
+
+    args = parser.parse_args()
+
+    strings = noisy_tag_strings(args.count)
+    print(f"{len(strings)} tag strings, {sum(len(s) for s in strings) / len(strings):.0f} characters each on average")
+    print(f"{'mode':<14}{'time (s)':>10}{'strings/min':>14}")
+
+    normalizer = TagNormalizer()
+    start = time.perf_counter()
+    expected = [normalizer(tags) for tags in strings]
+    seconds = time.perf_counter() - start
+    print(f"{'per string':<14}{seconds:>10.2f}{60 * len(strings) / seconds:>14,.0f}")
+
+    normalizer = TagNormalizer()
+    start = time.perf_counter()
+    actual = []
+    for i in range(0, len(strings), args.batch_size):
+        actual.extend(normalizer.normalize_batch(strings[i:i + args.batch_size]))
+    seconds = time.perf_counter() - start
+    print(f"{'batched':<14}{seconds:>10.2f}{60 * len(strings) / seconds:>14,.0f}")
+
+    if actual != expected:
+        sys.exit("batched normalization differs from normalizing one string at a time")
+    # The batch separator inside a tag string must neither start a new row nor survive as a tag
+    separator_strings = ["a,\x00,b", "C_c\x00", "\x00", "d"]
+    for normalize in (TagNormalizer().normalize_batch, lambda rows: list(map(TagNormalizer(), rows))):
+        if normalize(separator_strings) != ["a, b", "c c", "", "d"]:
+            sys.exit(f"tag strings containing the batch separator are misnormalized: {normalize(separator_strings)!r}")
+
+    # Threads sharing one normalizer whose memo keeps being cleared, as in the server
+    shared = TagNormalizer(max_memo_size=20)
+    failures = []
+
+    def normalize_concurrently(seed):
+        rng = random.Random(seed)
+        for _ in range(200):
+            batch = rng.sample(range(len(expected)), 5)
+            try:
+                if shared.normalize_batch([strings[i] for i in batch]) != [expected[i] for i in batch]:
+                    failures.append("wrong result")
+            except Exception as error:
+                failures.append(repr(error))
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    threads = [threading.Thread(target=normalize_concurrently, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    sys.setswitchinterval(switch_interval)
+    if failures:
+        sys.exit(f"concurrent normalization failed {len(failures)} times, e.g. {failures[0]}")
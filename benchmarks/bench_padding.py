@@ -0,0 +1,92 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import torch
+from transformers import T5ForConditionalGeneration
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from corpus import data
+from dataset import BucketBatchSampler, DynamicPaddingCollator, pad_sequences
+from modeling import load_tokenizer
+
+MAX_INPUT_LENGTH = 128
+MAX_OUTPUT_LENGTH = 64
+MODEL_NAME = "google-t5/t5-base"
+
+# The previous behaviour: every example padded to MAX_INPUT_LENGTH / MAX_OUTPUT_LENGTH
+class FixedPaddingCollator:
+    def __init__(self, pad_token_id):
+        self.pad_token_id = pad_token_id
+
+    def __call__(self, examples):
+        input_ids = [example["input_ids"] + [self.pad_token_id] * (MAX_INPUT_LENGTH - len(example["input_ids"])) for example in examples]
+        labels = [example["labels"] + [self.pad_token_id] * (MAX_OUTPUT_LENGTH - len(example["labels"])) for example in examples]
+        return {
+            "input_ids": pad_sequences(input_ids, self.pad_token_id),
+            "attention_mask": (pad_sequences(input_ids, self.pad_token_id) != self.pad_token_id).long(),
+            "labels": pad_sequences(labels, self.pad_token_id),
+        }
+
+# Times forward + backward over the given batches; returns (seconds, padded tokens, real tokens)
+def run(model, batches, device):
+    padded_tokens = real_tokens = 0
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for batch in batches:
+        batch = {key: value.to(device) for key, value in batch.items()}
+        loss = model(**batch).loss
+        loss.backward()
+        model.zero_grad(set_to_none=True)
+        padded_tokens += batch["input_ids"].numel() + batch["labels"].numel()
+        real_tokens += int(batch["attention_mask"].sum()) + int((batch["labels"] > 0).sum())
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+    return time.perf_counter() - start, padded_tokens, real_tokens
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare fixed max-length padding with per-batch dynamic padding and length bucketing")
+    parser.add_argument("--model-name", type=str, default=MODEL_NAME, help="Model name or local directory")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-batches", type=int, default=None, help="Only time this many batches per mode")
+    parser.add_argument("--pad-to-multiple-of", type=int, default=8)
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu")
+
+    args = parser.parse_args()
+    device = torch.device(args.device)
+
+    tokenizer = load_tokenizer(args.model_name)
+    model = T5ForConditionalGeneration.from_pretrained(args.model_name).to(device)
+    model.train()
+
+    input_ids = tokenizer([tags for tags, _ in data], max_length=MAX_INPUT_LENGTH, truncation=True).input_ids
+    labels = tokenizer([description for _, description in data], max_length=MAX_OUTPUT_LENGTH, truncation=True).input_ids
+    examples = [{"input_ids": ids, "labels": label_ids} for ids, label_ids in zip(input_ids, labels)]
+    random.Random(0).shuffle(examples)
+    chunks = [examples[i:i + args.batch_size] for i in range(0, len(examples), args.batch_size)][:args.max_batches]
+
+    sampler = BucketBatchSampler([len(example["input_ids"]) for example in examples], args.batch_size, shuffle=True, seed=0)
+    bucketed_chunks = [[examples[i] for i in indices] for indices in sampler][:args.max_batches]
+
+    fixed = FixedPaddingCollator(tokenizer.pad_token_id)
+    dynamic = DynamicPaddingCollator(tokenizer.pad_token_id)
+    dynamic_multiple = DynamicPaddingCollator(tokenizer.pad_token_id, pad_to_multiple_of=args.pad_to_multiple_of)
+    modes = {
+        "fixed (max_length)": [fixed(chunk) for chunk in chunks],
+        "dynamic": [dynamic(chunk) for chunk in chunks],
+        f"dynamic (multiple of {args.pad_to_multiple_of})": [dynamic_multiple(chunk) for chunk in chunks],
+        "dynamic + length buckets": [dynamic(chunk) for chunk in bucketed_chunks],
+    }
+    # Warm up kernels/allocator so the first mode isn't penalized
+    run(model, modes["dynamic"][:1], device)
+
+    baseline = None
+    print(f"{len(examples)} examples, {len(chunks)} batches of {args.batch_size} on {device}")
+    print(f"{'padding':<28}{'time (s)':>10}{'tokens':>10}{'% padding':>11}{'speedup':>9}")
+    for name, batches in modes.items():
+        seconds, padded_tokens, real_tokens = run(model, batches, device)
+        baseline = baseline or seconds
+        print(f"{name:<28}{seconds:>10.2f}{padded_tokens:>10}{100 * (1 - real_tokens / padded_tokens):>10.1f}%{baseline / seconds:>8.2f}x")
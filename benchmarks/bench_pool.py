@@ -0,0 +1,59 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from inference import BATCH_SIZE, DECODING_PRESETS, MODEL_NAME, SAFETENSORS_PATH, decoding_options
+from pool import DescriptionPool, available_cpus
+from train import validation_pairs
+
+# (RSS, PSS) in MB summed over this process's children, from /proc (Linux). PSS splits shared pages
+# between the processes mapping them, so PSS well below RSS means the workers share their weights.
+def children_memory_mb():
+    children = []
+    for task in os.listdir(f"/proc/{os.getpid()}/task"):
+        with open(f"/proc/{os.getpid()}/task/{task}/children") as f:
+            children.extend(f.read().split())
+    rss = pss = 0
+    for pid in children:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                fields = dict(line.split()[:2] for line in f if line.split()[-1:] == ["kB"])
+        except FileNotFoundError:
+            continue
+        rss += int(fields["Rss:"])
+        pss += int(fields["Pss:"])
+    return rss / 1024, pss / 1024
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of the CPU worker pool vs. number of worker processes")
+    parser.add_argument("--model-name", type=str, default=MODEL_NAME, help="Model name or local directory")
+    parser.add_argument("--weights", type=str, default=SAFETENSORS_PATH, help="safetensors weights shared by the workers")
+    parser.add_argument("--decoding", type=str, default="quality", choices=list(DECODING_PRESETS))
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="Worker counts to try (default: 1, 2, 4, ... up to the available cores)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--examples", type=int, default=256, help="Tag strings per run (the validation split, repeated)")
+
+    args = parser.parse_args()
+    cpus = available_cpus()
+    worker_counts = args.workers or [2 ** i for i in range(cpus.bit_length()) if 2 ** i <= cpus]
+
+    tags = [tags for tags, _ in validation_pairs()]
+    tags = (tags * (args.examples // len(tags) + 1))[:args.examples]
+    print(f"{len(tags)} examples, {args.decoding} decoding, {cpus} cores")
+    print(f"{'workers':>8}{'threads':>9}{'start-up (s)':>14}{'examples/s':>12}{'speed-up':>10}{'RSS sum (MB)':>14}{'PSS sum (MB)':>14}")
+    baseline = None
+    for workers in worker_counts:
+        pool = DescriptionPool(workers, max(1, cpus // workers), model_path=args.weights, model_name=args.model_name, decoding=decoding_options(args.decoding))
+        # The first run also spawns the workers and loads the model in each of them
+        start = time.perf_counter()
+        pool.generate_batch(tags, args.batch_size)
+        startup = time.perf_counter() - start
+        start = time.perf_counter()
+        pool.generate_batch(tags, args.batch_size)
+        throughput = len(tags) / (time.perf_counter() - start)
+        rss, pss = children_memory_mb()
+        pool.close()
+        baseline = baseline or throughput
+        print(f"{workers:>8}{pool.threads_per_worker:>9}{startup:>14.1f}{throughput:>12.1f}{throughput / baseline:>9.2f}x{rss:>14.0f}{pss:>14.0f}")
@@ -0,0 +1,70 @@
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from inference import BATCH_SIZE, MODEL_NAME, QUANTIZED_PATH, DescriptionGenerator, default_model_path, iter_batches
+from quality import exact_match, mean_token_f1
+from train import validation_pairs
+
+def model_size_mb(model):
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 2 ** 20
+
+# Generates descriptions for all tag strings; returns (descriptions, per-batch latencies in seconds)
+def run(generator, tags, batch_size):
+    descriptions, latencies = [], []
+    for batch in iter_batches(tags, batch_size):
+        start = time.perf_counter()
+        descriptions.extend(generator.generate_batch(batch, batch_size))
+        latencies.append(time.perf_counter() - start)
+    return descriptions, latencies
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the int8 quantized model with fp32 on the validation split (CPU)")
+    parser.add_argument("--model-name", type=str, default=MODEL_NAME, help="Model name or local directory")
+    parser.add_argument("--weights", type=str, default=None, help="fp32 weights (default: same as inference.py)")
+    parser.add_argument("--quantized-weights", type=str, default=QUANTIZED_PATH)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N validation examples")
+    parser.add_argument("--threads", type=int, default=None, help="torch.set_num_threads() value")
+
+    args = parser.parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    pairs = validation_pairs()[:args.limit]
+    tags = [tags for tags, _ in pairs]
+    references = [description for _, description in pairs]
+
+    results = {}
+    for name, kwargs in [
+        ("fp32", {"model_path": args.weights or default_model_path(), "device": torch.device("cpu")}),
+        ("int8", {"model_path": args.quantized_weights, "quantized": True}),
+    ]:
+        start = time.perf_counter()
+        generator = DescriptionGenerator(model_name=args.model_name, **kwargs)
+        load_seconds = time.perf_counter() - start
+        descriptions, latencies = run(generator, tags, args.batch_size)
+        results[name] = {
+            "descriptions": descriptions,
+            "load": load_seconds,
+            "size": model_size_mb(generator.model),
+            "p50": statistics.median(latencies),
+            "throughput": len(tags) / sum(latencies),
+            "f1": mean_token_f1(descriptions, references),
+        }
+        del generator
+
+    print(f"{len(tags)} validation examples, batch size {args.batch_size}, {torch.get_num_threads()} threads")
+    print(f"{'model':<8}{'load (s)':>10}{'size (MB)':>11}{'p50 batch (s)':>15}{'examples/s':>12}{'F1 vs ref':>11}")
+    for name, result in results.items():
+        print(f"{name:<8}{result['load']:>10.2f}{result['size']:>11.0f}{result['p50']:>15.3f}{result['throughput']:>12.1f}{result['f1']:>11.3f}")
+    fp32, int8 = results["fp32"]["descriptions"], results["int8"]["descriptions"]
+    print(f"int8 vs fp32: {100 * exact_match(int8, fp32):.1f}% identical, token F1 {mean_token_f1(int8, fp32):.3f}")
@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from inference import BATCH_SIZE, DECODING_PRESETS, MODEL_NAME, default_model_path, decoding_options
+
+ENGINES = ["generate", "shared_kv"]
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+# Runs in a fresh interpreter per engine so peak RSS belongs to that engine alone: loads the model,
+# generates once to warm up, then times a second pass. Peak growth is the highest RSS over both
+# passes minus RSS with the model loaded and used once. Prints a JSON line.
+def measure(args):
+    import torch
+
+    from inference import DescriptionGenerator
+    from shared_kv import SharedKVDescriptionGenerator
+    from train import validation_pairs
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    tags = [tags for tags, _ in validation_pairs()][:args.limit]
+    # A share of repeated inputs, as in real traffic; only shared_kv notices them
+    tags += tags[:int(len(tags) * args.duplicates)]
+    decoding = decoding_options(args.decoding)
+    if args.engine == "generate":
+        generator = DescriptionGenerator(model_name=args.model_name, model_path=args.weights, device=torch.device("cpu"), decoding=decoding)
+    else:
+        generator = SharedKVDescriptionGenerator(model_name=args.model_name, model_path=args.weights, decoding=decoding)
+    # One input first pages in the (memory-mapped) weights; the baseline is taken before the full
+    # warm-up, which would otherwise leave freed memory in the allocator
+    generator.generate_batch(tags[:1])
+    before = rss_mb()
+    generator.generate_batch(tags[:args.batch_size], args.batch_size)
+    start = time.perf_counter()
+    descriptions = generator.generate_batch(tags, args.batch_size)
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"seconds": seconds, "examples": len(tags), "peak_growth_mb": max(0.0, peak - before), "descriptions": descriptions}))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency and memory of shared encoder/cross-attention states vs. model.generate() (CPU)")
+    parser.add_argument("--model-name", type=str, default=MODEL_NAME, help="Model name or local directory")
+    parser.add_argument("--weights", type=str, default=None, help="Fine-tuned weights (default: same as inference.py)")
+    parser.add_argument("--decoding", type=str, default="quality", choices=list(DECODING_PRESETS))
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N validation examples")
+    parser.add_argument("--duplicates", type=float, default=0.0, help="Append this fraction of the examples again as repeats")
+    parser.add_argument("--threads", type=int, default=None, help="torch.set_num_threads() value")
+    parser.add_argument("--engine", type=str, default=None, choices=ENGINES, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+    args.weights = os.path.abspath(args.weights or default_model_path())
+    if args.engine:
+        measure(args)
+        sys.exit(0)
+
+    results = {}
+    for engine in ENGINES:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--weights", args.weights, "--engine", engine],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        results[engine] = json.loads(output.strip().splitlines()[-1])
+
+    baseline = results["generate"]
+    print(f"{baseline['examples']} examples, {args.decoding} decoding {decoding_options(args.decoding)}, batch size {args.batch_size}")
+    print(f"{'engine':<12}{'time (s)':>10}{'ms/example':>12}{'speed-up':>10}{'peak growth (MB)':>18}")
+    for engine, result in results.items():
+        print(
+            f"{engine:<12}{result['seconds']:>10.2f}{1000 * result['seconds'] / result['examples']:>12.1f}"
+            f"{baseline['seconds'] / result['seconds']:>9.2f}x{result['peak_growth_mb']:>18.0f}"
+        )
+    same = sum(a == b for a, b in zip(baseline["descriptions"], results["shared_kv"]["descriptions"]))
+    print(f"identical descriptions: {same}/{len(baseline['descriptions'])}")
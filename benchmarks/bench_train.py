@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import train
+from step_timer import PHASES, StepTimer, format_summary, make_profiler
+
+# Trains for a few epochs with train.train() and reports, per epoch, throughput and the share of the
+# time spent in each phase of the step. The default tiny random-init T5 makes this run on one CPU in
+# about a minute without downloads; the phase shares of a real model on a GPU differ, the harness
+# doesn't. Nothing is saved apart from the token cache (in a temporary directory).
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Training throughput and time per step phase (data loading, copy, forward, backward, optimizer)")
+    parser.add_argument("--model-name", type=str, default=None, help="Model name or local directory (default: a tiny randomly initialised T5, no downloads)")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=train.BATCH_SIZE)
+    parser.add_argument("--num-workers", type=int, default=train.NUM_WORKERS, help="DataLoader workers")
+    parser.add_argument("--device", type=str, default=None, help="Default: cuda if available")
+    parser.add_argument("--sync", action="store_true", help="Wait for the GPU after every phase so CUDA phase times are exact")
+    parser.add_argument("--profile-dir", type=str, default=None, help="Write a torch.profiler trace of a window of steps here")
+    parser.add_argument("--profile-wait", type=int, default=train.PROFILE_WAIT)
+    parser.add_argument("--profile-warmup", type=int, default=train.PROFILE_WARMUP)
+    parser.add_argument("--profile-steps", type=int, default=train.PROFILE_STEPS)
+    parser.add_argument("--output", type=str, default=None, help="Also write the per-epoch summaries to this JSON file")
+
+    args = parser.parse_args()
+    import torch
+    from torch.cuda.amp import GradScaler
+
+    from modeling import default_device, load_model, load_tokenizer
+
+    device = torch.device(args.device) if args.device else default_device()
+    with tempfile.TemporaryDirectory() as work_dir:
+        model_name = args.model_name
+        if model_name is None:
+            from tiny_model import make_tiny_model
+
+            model_name = os.path.join(work_dir, "tiny-t5")
+            make_tiny_model(model_name)
+        train.CACHE_DIR = os.path.join(work_dir, "token_cache")
+        train.BATCH_SIZE = args.batch_size
+        train.NUM_WORKERS = args.num_workers
+
+        torch.manual_seed(train.SEED)
+        tokenizer = load_tokenizer(model_name)
+        model = load_model(model_name, device=device)
+        train_loader, _ = train.build_dataloaders(tokenizer, device)
+        optimizer = train.build_optimizer(model)
+        scaler = GradScaler(enabled=device.type == "cuda")
+
+        profiler = make_profiler(args.profile_dir, args.profile_wait, args.profile_warmup, args.profile_steps) if args.profile_dir else None
+        timer = StepTimer(device, synchronize=args.sync, profiler=profiler)
+        if profiler:
+            profiler.start()
+        summaries = []
+        print(f"{model_name}, batch size {args.batch_size}, {args.num_workers} DataLoader workers, {device}")
+        for epoch in range(args.epochs):
+            for source in (train_loader.dataset, getattr(train_loader.dataset, "dataset", None), train_loader.batch_sampler):
+                if hasattr(source, "set_epoch"):
+                    source.set_epoch(epoch)
+            loss, summary = train.train(model, train_loader, optimizer, scaler, reporter=train.LossReporter(interval=0), timer=timer)
+            summaries.append(dict(summary, epoch=epoch + 1, loss=loss))
+            print(f"Epoch {epoch + 1}: loss {loss:.4f}, {summary['steps']} steps in {summary['seconds']:.1f}s")
+            print(f"  {format_summary(summary)}")
+        if profiler:
+            profiler.stop()
+
+    # The first epoch also pays for worker start-up and warm-up, so the rest are the steady state
+    steady = summaries[1:] or summaries
+    seconds = sum(summary["seconds"] for summary in steady)
+    print(f"\nSteady state (epochs {steady[0]['epoch']}-{steady[-1]['epoch']}): "
+          f"{sum(summary['tokens'] for summary in steady) / seconds:.0f} tokens/sec, "
+          f"{sum(summary['examples'] for summary in steady) / seconds:.1f} examples/sec")
+    print("  " + ", ".join(f"{phase} {sum(summary['phase_seconds'][phase] for summary in steady) / seconds:.1%}" for phase in PHASES + ["other"]))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"model": model_name if args.model_name else "tiny", "batch_size": args.batch_size,
+                       "num_workers": args.num_workers, "device": str(device), "epochs": summaries}, f, indent=2)
+            f.write("\n")
@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from inference import BATCH_SIZE, MAX_INPUT_LENGTH, MAX_OUTPUT_LENGTH, MODEL_NAME, default_model_path, decoding_options
+from modeling import load_model, load_tokenizer
+from onnx_backend import ONNX_DIR, OnnxDescriptionGenerator
+from train import validation_pairs
+
+# Max absolute difference between PyTorch and ONNX Runtime first-step logits for a batch of inputs
+def logits_difference(model, generator, encoding):
+    input_ids = encoding["input_ids"].numpy()
+    attention_mask = encoding["attention_mask"].numpy()
+    cross_key_values, = generator.encoder.run(None, {"input_ids": input_ids, "attention_mask": attention_mask})
+    start = np.full(len(input_ids), generator.decoder_start_token_id, dtype=np.int64)
+    onnx_logits, _ = generator.step(start, attention_mask, cross_key_values, generator.empty_cache(cross_key_values, len(start)), 0)
+    with torch.no_grad():
+        torch_logits = model(**encoding, decoder_input_ids=torch.from_numpy(start)[:, None]).logits[:, -1]
+    return float(np.abs(torch_logits.numpy() - onnx_logits).max())
+
+def torch_generate(model, tokenizer, tags, decoding, batch_size):
+    descriptions = []
+    for start in range(0, len(tags), batch_size):
+        encoding = tokenizer(tags[start:start + batch_size], max_length=MAX_INPUT_LENGTH, truncation=True, padding=True, return_tensors="pt")
+        with torch.no_grad():
+            outputs = model.generate(**encoding, max_length=MAX_OUTPUT_LENGTH, **decoding)
+        descriptions.extend(tokenizer.batch_decode(outputs, skip_special_tokens=True))
+    return descriptions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the ONNX Runtime backend against model.generate() on the validation split")
+    parser.add_argument("--model-name", type=str, default=MODEL_NAME, help="Model name or local directory")
+    parser.add_argument("--weights", type=str, default=None, help="Fine-tuned weights (default: same as inference.py)")
+    parser.add_argument("--onnx-dir", type=str, default=ONNX_DIR)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N validation examples")
+    parser.add_argument("--tolerance", type=float, default=1e-3, help="Allowed max absolute logit difference")
+
+    args = parser.parse_args()
+
+    tags = [tags for tags, _ in validation_pairs()[:args.limit]]
+    tokenizer = load_tokenizer(args.model_name)
+    model = load_model(args.model_name, args.weights or default_model_path(), device=torch.device("cpu")).eval()
+
+    failures = []
+    encoding = tokenizer(tags[:args.batch_size], max_length=MAX_INPUT_LENGTH, truncation=True, padding=True, return_tensors="pt")
+    difference = logits_difference(model, OnnxDescriptionGenerator(args.onnx_dir), encoding)
+    print(f"max |logit difference| on the first step: {difference:.2e}")
+    if difference > args.tolerance:
+        failures.append("logits")
+
+    print(f"{len(tags)} validation examples, batch size {args.batch_size}")
+    print(f"{'decoding':<10}{'torch (s)':>11}{'onnx (s)':>10}{'identical':>11}")
+    for name in ["fast", "balanced", "quality"]:
+        decoding = decoding_options(name)
+        start = time.perf_counter()
+        expected = torch_generate(model, tokenizer, tags, decoding, args.batch_size)
+        torch_seconds = time.perf_counter() - start
+        generator = OnnxDescriptionGenerator(args.onnx_dir, decoding=decoding)
+        start = time.perf_counter()
+        actual = generator.generate_batch(tags, args.batch_size)
+        onnx_seconds = time.perf_counter() - start
+        mismatches = [i for i, (a, b) in enumerate(zip(expected, actual)) if a != b]
+        print(f"{name:<10}{torch_seconds:>11.2f}{onnx_seconds:>10.2f}{len(tags) - len(mismatches):>6}/{len(tags)}")
+        for i in mismatches[:5]:
+            print(f"  {tags[i]!r}\n    torch: {expected[i]!r}\n    onnx:  {actual[i]!r}")
+        if mismatches:
+            failures.append(name)
+
+    if failures:
+        sys.exit(f"ONNX Runtime output differs from PyTorch: {', '.join(failures)}")
@@ -0,0 +1,53 @@
+import argparse
+import os
+import sys
+import tempfile
+
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import train
+from tiny_model import make_tiny_model
+
+# Trains the tiny model with train.main() (dropout on) for two epochs, then deletes every checkpoint
+# after one in the middle of the last epoch and runs main() again, which resumes from it. An exact
+# resume ends with the same weights as the uninterrupted run.
+def run(seed):
+    # Only the uninterrupted run depends on this; the resumed one restores the checkpoint's RNG states
+    torch.manual_seed(seed)
+    train.main()
+    return torch.load(train.MODEL_PATH)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that a resumed training run ends with the same weights as an uninterrupted one")
+    parser.add_argument("--num-workers", type=int, default=train.NUM_WORKERS, help="DataLoader workers")
+    parser.add_argument("--resume-step", type=int, default=4, help="Resume from the checkpoint at this step of the last epoch")
+
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as work_dir:
+        train.MODEL_NAME = os.path.join(work_dir, "tiny-t5")
+        make_tiny_model(train.MODEL_NAME)
+        train.EPOCHS = 2
+        train.CHECKPOINT_INTERVAL = 2
+        train.KEEP_CHECKPOINTS = 100
+        train.LOG_INTERVAL = 0
+        train.NUM_WORKERS = args.num_workers
+        train.CACHE_DIR = os.path.join(work_dir, "token_cache")
+        train.CHECKPOINT_DIR = os.path.join(work_dir, "checkpoints")
+        train.MODEL_PATH = os.path.join(work_dir, "model.pth")
+        train.SAFETENSORS_PATH = os.path.join(work_dir, "model.safetensors")
+
+        expected = run(train.SEED)
+        checkpointer = train.Checkpointer(train.CHECKPOINT_DIR)
+        resume_path = checkpointer.path(train.EPOCHS - 1, args.resume_step)
+        if resume_path not in checkpointer.checkpoints():
+            sys.exit(f"no checkpoint {resume_path}; pick another --resume-step")
+        for path in checkpointer.checkpoints():
+            if path > resume_path:
+                os.remove(path)
+        actual = run(train.SEED + 1)
+
+    difference = max(float((expected[name].float() - actual[name].float()).abs().max()) for name in expected)
+    print(f"max weight difference after resuming from {os.path.basename(resume_path)} with {args.num_workers} workers: {difference:.3g}")
+    if difference:
+        sys.exit("the resumed run does not reproduce the uninterrupted one")
@@ -0,0 +1,48 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench_padding import MAX_INPUT_LENGTH, MAX_OUTPUT_LENGTH, MODEL_NAME
+from corpus import data
+from modeling import load_tokenizer
+
+# Encodes texts one at a time (the old __getitem__ path) and returns (ids, seconds)
+def encode_one_by_one(tokenizer, texts, max_length):
+    start = time.perf_counter()
+    ids = [tokenizer(text, max_length=max_length, truncation=True).input_ids for text in texts]
+    return ids, time.perf_counter() - start
+
+# Encodes all texts with one batched call and returns (ids, seconds)
+def encode_batched(tokenizer, texts, max_length):
+    start = time.perf_counter()
+    ids = tokenizer(texts, max_length=max_length, truncation=True).input_ids
+    return ids, time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check T5TokenizerFast against T5Tokenizer on the training corpus and time both")
+    parser.add_argument("--model-name", type=str, default=MODEL_NAME, help="Model name or local directory")
+
+    args = parser.parse_args()
+
+    slow = load_tokenizer(args.model_name, fast=False)
+    fast = load_tokenizer(args.model_name, fast=True)
+
+    mismatches = 0
+    print(f"{'field':<14}{'slow, one by one (s)':>22}{'fast, batched (s)':>19}{'mismatches':>12}")
+    for field, texts, max_length in [
+        ("tags", [tags for tags, _ in data], MAX_INPUT_LENGTH),
+        ("descriptions", [description for _, description in data], MAX_OUTPUT_LENGTH),
+    ]:
+        slow_ids, slow_seconds = encode_one_by_one(slow, texts, max_length)
+        fast_ids, fast_seconds = encode_batched(fast, texts, max_length)
+        differing = [i for i, (a, b) in enumerate(zip(slow_ids, fast_ids)) if a != b]
+        print(f"{field:<14}{slow_seconds:>22.3f}{fast_seconds:>19.3f}{len(differing):>12}")
+        for i in differing[:5]:
+            print(f"  {texts[i]!r}\n    slow: {slow_ids[i]}\n    fast: {fast_ids[i]}")
+        mismatches += len(differing)
+
+    if mismatches:
+        sys.exit(f"{mismatches} of {2 * len(data)} texts tokenize differently")
+    print(f"All {2 * len(data)} texts tokenize identically")
@@ -0,0 +1,20 @@
+from collections import Counter
+
+# Unigram F1 between two descriptions (case-insensitive, whitespace tokens); 1.0 for identical text
+def token_f1(prediction, reference):
+    prediction_tokens = prediction.lower().split()
+    reference_tokens = reference.lower().split()
+    if not prediction_tokens or not reference_tokens:
+        return float(prediction_tokens == reference_tokens)
+    overlap = sum((Counter(prediction_tokens) & Counter(reference_tokens)).values())
+    if overlap == 0:
+        return 0.0
+    precision = overlap / len(prediction_tokens)
+    recall = overlap / len(reference_tokens)
+    return 2 * precision * recall / (precision + recall)
+
+def mean_token_f1(predictions, references):
+    return sum(token_f1(p, r) for p, r in zip(predictions, references)) / max(len(predictions), 1)
+
+def exact_match(predictions, references):
+    return sum(p == r for p, r in zip(predictions, references)) / max(len(predictions), 1)
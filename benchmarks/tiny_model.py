@@ -0,0 +1,74 @@
+import argparse
+import collections
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from corpus import data
+
+# Small enough to train or generate with in seconds on one CPU core; same architecture as t5-base
+TINY_CONFIG = {"d_model": 64, "d_ff": 256, "num_layers": 2, "num_decoder_layers": 2, "num_heads": 4, "d_kv": 16}
+TINY_VOCAB_SIZE = 1000
+# Word-start marker of SentencePiece (and the Metaspace pre-tokenizer)
+SPACE = "\u2581"
+# Written by save_pretrained(); pass it as the weights path next to model_name=output_dir
+WEIGHTS_FILE = "model.safetensors"
+
+# SentencePiece-style unigram tokenizer with T5's special tokens (<pad> = 0, </s> = 1, <unk> = 2) and
+# an </s> appended to every sequence. Instead of training one (the trainer doesn't give the same
+# vocabulary twice), its pieces are every character of the texts plus their most frequent words,
+# scored by log frequency, so the same texts always give the same ids.
+def build_tokenizer(texts, vocab_size=TINY_VOCAB_SIZE):
+    from tokenizers import Tokenizer, decoders, models, normalizers, pre_tokenizers, processors
+    from transformers import T5TokenizerFast
+
+    special_tokens = ["<pad>", "</s>", "<unk>"]
+    words = collections.Counter(SPACE + word for text in texts for word in text.split())
+    characters = collections.Counter(character for word, count in words.items() for character in word * count)
+    pieces = dict(characters)
+    for word, count in sorted(words.items(), key=lambda item: (-item[1], item[0])):
+        if len(pieces) >= vocab_size - len(special_tokens):
+            break
+        pieces.setdefault(word, count)
+    total = sum(pieces.values())
+    vocab = [(token, 0.0) for token in special_tokens]
+    vocab += [(piece, math.log(count / total)) for piece, count in sorted(pieces.items(), key=lambda item: (-item[1], item[0]))]
+
+    tokenizer = Tokenizer(models.Unigram(vocab, unk_id=special_tokens.index("<unk>")))
+    tokenizer.normalizer = normalizers.NFKC()
+    tokenizer.pre_tokenizer = pre_tokenizers.Metaspace()
+    tokenizer.decoder = decoders.Metaspace()
+    tokenizer.post_processor = processors.TemplateProcessing(single="$A </s>", pair="$A </s> $B </s>", special_tokens=[("</s>", special_tokens.index("</s>"))])
+    return T5TokenizerFast(tokenizer_object=tokenizer, pad_token="<pad>", eos_token="</s>", unk_token="<unk>", extra_ids=0)
+
+# Writes a randomly initialised T5 with TINY_CONFIG and its tokenizer to output_dir, usable as
+# model_name (with output_dir/WEIGHTS_FILE as the weights) wherever t5-base is, without downloads.
+# The same seed always gives the same files, so timings and outputs are comparable across runs.
+# Untrained weights never pick </s>, so every generation runs to the maximum length.
+def make_tiny_model(output_dir, seed=0):
+    import torch
+    from transformers import T5Config, T5ForConditionalGeneration
+
+    tokenizer = build_tokenizer([text for pair in data for text in pair])
+    config = T5Config(
+        vocab_size=len(tokenizer),
+        decoder_start_token_id=tokenizer.pad_token_id,
+        pad_token_id=tokenizer.pad_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        **TINY_CONFIG,
+    )
+    torch.manual_seed(seed)
+    model = T5ForConditionalGeneration(config)
+    model.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    return os.path.join(output_dir, WEIGHTS_FILE)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a tiny randomly initialised T5 for benchmarks and smoke tests (no downloads)")
+    parser.add_argument("output_dir", type=str)
+    parser.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    weights_path = make_tiny_model(args.output_dir, args.seed)
+    print(f"Wrote {args.output_dir}; use --model-name {args.output_dir} --weights {weights_path}")
@@ -0,0 +1,101 @@
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from normalize import normalize_tags
+
+# Tag order doesn't matter to the model (training shuffles it), so "B, a, a" and "a, b" share one key
+def canonical_tags(input_text):
+    return ", ".join(sorted(normalize_tags(input_text).split(", ")))
+
+# In-memory LRU of canonical tags -> description, optionally backed by a SQLite file that survives
+# restarts (entries evicted from memory are still found there). Entries of other models stay in the
+# file unused (see CachedGenerator); delete it to reclaim the space.
+class DescriptionCache:
+    def __init__(self, max_entries=10000, path=None):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = 0
+        self.db = None
+        if path:
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS descriptions (tags TEXT PRIMARY KEY, description TEXT NOT NULL)")
+            self.db.commit()
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            row = self.db.execute("SELECT description FROM descriptions WHERE tags = ?", (key,)).fetchone() if self.db else None
+            if row is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self.remember(key, row[0])
+            return row[0]
+
+    def put_many(self, items):
+        with self.lock:
+            for key, description in items:
+                self.remember(key, description)
+            if self.db:
+                self.db.executemany("INSERT OR REPLACE INTO descriptions VALUES (?, ?)", items)
+                self.db.commit()
+
+    def count_hits(self, count):
+        with self.lock:
+            self.hits += count
+
+    def remember(self, key, description):
+        self.entries[key] = description
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        if self.db:
+            self.db.close()
+            self.db = None
+
+# Wraps any generator with generate()/generate_batch() (PyTorch or ONNX Runtime). Only inputs whose
+# canonical tags are not cached reach the model, each distinct one once, in canonical form so the
+# cached description doesn't depend on which permutation was seen first. Keys include model_key (see
+# inference.model_fingerprint) and the decoding options, so descriptions from different models or
+# presets don't mix. Sampling bypasses the cache: every call is meant to give a fresh description.
+class CachedGenerator:
+    def __init__(self, generator, cache, model_key=""):
+        self.generator = generator
+        self.cache = cache
+        self.model_key = model_key
+
+    def generate(self, input_text):
+        return self.generate_batch([input_text])[0]
+
+    def generate_batch(self, input_texts, *args, decoding=None, **kwargs):
+        if (decoding or self.generator.decoding).get("do_sample"):
+            return self.generator.generate_batch(input_texts, *args, decoding=decoding, **kwargs)
+        prefix = f"{self.model_key}\t{json.dumps(decoding or self.generator.decoding, sort_keys=True)}\t"
+        tags = [canonical_tags(text) for text in input_texts]
+        found = {key: self.cache.get(prefix + key) for key in dict.fromkeys(tags)}
+        missing = [key for key, description in found.items() if description is None]
+        # Repeats of a tag set within the batch are generated once, so they count as hits
+        self.cache.count_hits(len(tags) - len(found))
+        if missing:
+            generated = dict(zip(missing, self.generator.generate_batch(missing, *args, decoding=decoding, **kwargs)))
+            self.cache.put_many([(prefix + key, description) for key, description in generated.items()])
+            found.update(generated)
+        return [found[key] for key in tags]
@@ -0,0 +1,96 @@
+import glob
+import os
+import random
+import re
+import threading
+
+CHECKPOINT_PATTERN = re.compile(r"checkpoint-e(\d+)-s(\d+)\.pt$")
+
+# Copies every tensor in a (nested) state dict to CPU memory, so training can keep
+# updating the live tensors while the copy is written out
+def snapshot(obj):
+    import torch
+
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        return {key: snapshot(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(snapshot(value) for value in obj)
+    return obj
+
+def rng_state():
+    import numpy as np
+    import torch
+
+    state = {"python": random.getstate(), "numpy": np.random.get_state(), "torch": torch.get_rng_state()}
+    if torch.cuda.is_available():
+        state["cuda"] = torch.cuda.get_rng_state_all()
+    return state
+
+def set_rng_state(state):
+    import numpy as np
+    import torch
+
+    random.setstate(state["python"])
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+    if "cuda" in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state["cuda"])
+
+# Writes checkpoints to `directory` on a background thread and keeps the newest `keep` of them.
+# save() takes the CPU snapshot synchronously and returns; at most one write is in flight.
+class Checkpointer:
+    def __init__(self, directory, keep=2):
+        # The newest checkpoint is the one training resumes from, so at least that one is kept
+        if keep < 1:
+            raise ValueError(f"keep must be at least 1, got {keep}")
+        self.directory = directory
+        self.keep = keep
+        self.thread = None
+        self.error = None
+
+    def path(self, epoch, step):
+        return os.path.join(self.directory, f"checkpoint-e{epoch:04d}-s{step:08d}.pt")
+
+    def checkpoints(self):
+        paths = glob.glob(os.path.join(self.directory, "checkpoint-e*-s*.pt"))
+        return sorted(path for path in paths if CHECKPOINT_PATTERN.search(path))
+
+    def latest(self):
+        checkpoints = self.checkpoints()
+        return checkpoints[-1] if checkpoints else None
+
+    def save(self, state, epoch, step):
+        self.wait()
+        state = snapshot(state)
+        self.thread = threading.Thread(target=self.write, args=(state, self.path(epoch, step)), daemon=True)
+        self.thread.start()
+
+    def write(self, state, path):
+        import torch
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            torch.save(state, tmp_path)
+            os.replace(tmp_path, path)
+            for old_path in self.checkpoints()[:-self.keep]:
+                os.remove(old_path)
+        except Exception as error:
+            self.error = error
+
+    # Blocks until the pending write finishes and re-raises any error it hit
+    def wait(self):
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+def load_checkpoint(path):
+    import torch
+
+    # Checkpoints hold optimizer/RNG state (numpy arrays, tuples), not just tensors
+    return torch.load(path, map_location="cpu", weights_only=False)
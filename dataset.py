@@ -0,0 +1,386 @@
+import csv
+import glob
+import hashlib
+import itertools
+import json
+import os
+import random
+import shutil
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset, IterableDataset, Sampler, get_worker_info
+
+from vocab import TagVocabulary
+
+# Batches drawn from a bucket of BUCKET_BATCHES * batch_size examples are sorted by length together
+BUCKET_BATCHES = 50
+# Bump when the on-disk layout or contents written by pretokenize() change
+CACHE_VERSION = 4
+
+# Pads variable-length token id lists to the longest one (optionally rounded up to a multiple)
+def pad_sequences(sequences, pad_value, pad_to_multiple_of=None):
+    max_length = max(len(sequence) for sequence in sequences)
+    if pad_to_multiple_of:
+        max_length = -(-max_length // pad_to_multiple_of) * pad_to_multiple_of
+    padded = torch.full((len(sequences), max_length), pad_value, dtype=torch.long)
+    for i, sequence in enumerate(sequences):
+        padded[i, :len(sequence)] = torch.as_tensor(sequence, dtype=torch.long)
+    return padded
+
+# collate_fn that pads each batch to its own longest example instead of MAX_INPUT_LENGTH/MAX_OUTPUT_LENGTH.
+# Label padding uses -100 so padded target positions are ignored by the loss.
+class DynamicPaddingCollator:
+    def __init__(self, pad_token_id, pad_to_multiple_of=None, label_pad_token_id=-100):
+        self.pad_token_id = pad_token_id
+        self.pad_to_multiple_of = pad_to_multiple_of
+        self.label_pad_token_id = label_pad_token_id
+
+    def __call__(self, examples):
+        input_ids = [example["input_ids"] for example in examples]
+        batch = {
+            "input_ids": pad_sequences(input_ids, self.pad_token_id, self.pad_to_multiple_of),
+            "attention_mask": pad_sequences([[1] * len(ids) for ids in input_ids], 0, self.pad_to_multiple_of),
+        }
+        if "labels" in examples[0]:
+            labels = [example["labels"] for example in examples]
+            batch["labels"] = pad_sequences(labels, self.label_pad_token_id, self.pad_to_multiple_of)
+        return batch
+
+# Groups examples of similar length into the same batch so dynamic padding has little to pad.
+# With shuffle, examples are shuffled, cut into buckets, sorted by length inside each bucket,
+# and the resulting batches are shuffled again. The order depends only on (seed, epoch); every
+# pass moves on to the next epoch unless set_epoch() says otherwise, and skip() drops the
+# first batches of the next pass (to resume mid-epoch). __iter__ is a generator, so the epoch
+# and skip are only used up once a pass starts: multiprocess DataLoaders call iter() twice when
+# they start and throw the first iterator away unused.
+# Without shuffle, all indices are sorted by length (callers restore the original order).
+class BucketBatchSampler(Sampler):
+    def __init__(self, lengths, batch_size, shuffle=True, bucket_batches=BUCKET_BATCHES, drop_last=False, seed=None):
+        self.lengths = lengths
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.bucket_size = batch_size * bucket_batches if shuffle else max(len(lengths), 1)
+        self.drop_last = drop_last
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.epoch = 0
+        self.skip_batches = 0
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def skip(self, batches):
+        self.skip_batches = batches
+
+    def __iter__(self):
+        rng = random.Random(f"{self.seed}-{self.epoch}")
+        self.epoch += 1
+        indices = list(range(len(self.lengths)))
+        if self.shuffle:
+            rng.shuffle(indices)
+        batches = []
+        for start in range(0, len(indices), self.bucket_size):
+            bucket = sorted(indices[start:start + self.bucket_size], key=self.lengths.__getitem__)
+            batches.extend(bucket[i:i + self.batch_size] for i in range(0, len(bucket), self.batch_size))
+        if self.drop_last and batches and len(batches[-1]) < self.batch_size:
+            batches.pop()
+        if self.shuffle:
+            rng.shuffle(batches)
+        batches, self.skip_batches = batches[self.skip_batches:], 0
+        yield from batches
+
+    def __len__(self):
+        if self.drop_last:
+            return len(self.lengths) // self.batch_size
+        return -(-len(self.lengths) // self.batch_size)
+
+# Identifies a tokenizer by class and vocabulary, so a changed tokenizer invalidates the token cache
+def tokenizer_fingerprint(tokenizer):
+    vocab = json.dumps(sorted(tokenizer.get_vocab().items()))
+    return hashlib.sha256(f"{type(tokenizer).__name__}\n{tokenizer.all_special_tokens}\n{vocab}".encode("utf-8")).hexdigest()
+
+def corpus_fingerprint(pairs):
+    digest = hashlib.sha256()
+    for input_text, target_text in pairs:
+        digest.update(f"{input_text}\0{target_text}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def cache_key(pairs, tokenizer, max_input_length, max_output_length):
+    settings = {
+        "version": CACHE_VERSION,
+        "tokenizer": tokenizer_fingerprint(tokenizer),
+        "max_input_length": max_input_length,
+        "max_output_length": max_output_length,
+        "corpus": corpus_fingerprint(pairs),
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+# Stores a list of token id lists as one flat array plus offsets (row i is flat[offsets[i]:offsets[i + 1]])
+def write_ragged(path, name, sequences, dtype):
+    offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+    np.cumsum([len(sequence) for sequence in sequences], out=offsets[1:])
+    flat = np.fromiter(itertools.chain.from_iterable(sequences), dtype=dtype, count=int(offsets[-1]))
+    np.save(os.path.join(path, f"{name}.npy"), flat)
+    np.save(os.path.join(path, f"{name}_offsets.npy"), offsets)
+
+# Tokenizes (tags, description) pairs once and caches them under cache_dir/<key>, where the key covers
+# the corpus, the tokenizer and the max lengths. Each input is also stored as an array of tag ids
+# from a TagVocabulary built over the corpus (saved alongside); the text given to the tokenizer is
+# rendered from those ids. Every vocabulary tag is tokenized on its own as well, so inputs with the
+# tags in another order can be assembled from these spans (see PretokenizedDataset). Returns the
+# cache directory for PretokenizedDataset.
+def pretokenize(pairs, tokenizer, cache_dir, max_input_length, max_output_length, chunk_size=1024):
+    path = os.path.join(cache_dir, cache_key(pairs, tokenizer, max_input_length, max_output_length))
+    if os.path.exists(os.path.join(path, "meta.json")):
+        return path
+
+    vocabulary = TagVocabulary.build(input_text for input_text, _ in pairs)
+    tag_ids = [vocabulary.encode(input_text) for input_text, _ in pairs]
+    input_ids, labels = [], []
+    for start in range(0, len(pairs), chunk_size):
+        chunk = pairs[start:start + chunk_size]
+        input_ids.extend(tokenizer([vocabulary.decode(ids) for ids in tag_ids[start:start + chunk_size]], max_length=max_input_length, truncation=True).input_ids)
+        labels.extend(tokenizer([target_text for _, target_text in chunk], max_length=max_output_length, truncation=True).input_ids)
+
+    tag_tokens = tokenizer([vocabulary[tag_id] for tag_id in range(len(vocabulary))], add_special_tokens=False).input_ids if len(vocabulary) else []
+    # Token ids between two tags: what "a, a" tokenizes to around the two "a"s
+    single = tokenizer("a", add_special_tokens=False).input_ids
+    pair = tokenizer("a, a", add_special_tokens=False).input_ids
+    separator_ids = pair[len(single):len(pair) - len(single)]
+    # A tag can be moved anywhere if its span comes out unchanged with a separator on either side of
+    # it, i.e. the tokenizer never merges across that boundary. Checking each example's stored order
+    # isn't enough: another order puts other tags next to each separator. Inputs made only of such
+    # tags (and matching their stored tokens) can have their tags reordered; the rest keep their order.
+    tags = [vocabulary[tag_id] for tag_id in range(len(vocabulary))]
+    tag_before = tokenizer([f"{tag}, a" for tag in tags], add_special_tokens=False).input_ids if tags else []
+    tag_after = tokenizer([f"a, {tag}" for tag in tags], add_special_tokens=False).input_ids if tags else []
+    movable = [
+        before == span + separator_ids + single and after == single + separator_ids + span
+        for span, before, after in zip(tag_tokens, tag_before, tag_after)
+    ]
+    composable = np.array([
+        all(movable[tag_id] for tag_id in ids)
+        and compose_input([tag_tokens[tag_id] for tag_id in ids], separator_ids, tokenizer.eos_token_id, max_input_length) == tokens
+        for ids, tokens in zip(tag_ids, input_ids)
+    ], dtype=bool)
+
+    # Written to a temporary directory first so an interrupted run never leaves a half-written cache
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    os.makedirs(tmp_path, exist_ok=True)
+    dtype = np.uint16 if len(tokenizer) <= np.iinfo(np.uint16).max + 1 else np.int32
+    write_ragged(tmp_path, "input_ids", input_ids, dtype)
+    write_ragged(tmp_path, "labels", labels, dtype)
+    write_ragged(tmp_path, "tag_ids", tag_ids, vocabulary.dtype())
+    write_ragged(tmp_path, "tag_tokens", tag_tokens, dtype)
+    np.save(os.path.join(tmp_path, "composable.npy"), composable)
+    vocabulary.save(tmp_path)
+    with open(os.path.join(tmp_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "examples": len(pairs),
+            "max_input_length": max_input_length,
+            "max_output_length": max_output_length,
+            "separator_ids": separator_ids,
+            "eos_token_id": tokenizer.eos_token_id,
+        }, f)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        # Another process finished the same cache first
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return path
+
+# Token ids of the tags' spans joined by separator_ids, truncated as the tokenizer does and ended with
+# EOS: the same as tokenizing the rendered tag string, without running the tokenizer
+def compose_input(spans, separator_ids, eos_token_id, max_input_length):
+    tokens = []
+    for i, span in enumerate(spans):
+        if i:
+            tokens.extend(separator_ids)
+        tokens.extend(span)
+    return tokens[:max_input_length - 1] + [eos_token_id]
+
+# Reads token and tag ids written by pretokenize(); the arrays are memory-mapped, not loaded into RAM.
+# Pickling (for spawned DataLoader workers) only sends the path and settings; each worker maps the files itself.
+# With shuffle_tags, every access returns the input with its tags in a fresh order, assembled from the
+# cached per-tag token spans. The order depends on (seed, epoch, index); the epoch lives in shared memory
+# so set_epoch() in the main process also reaches (persistent) DataLoader workers.
+class PretokenizedDataset(Dataset):
+    def __init__(self, path, shuffle_tags=False, seed=0):
+        self.path = path
+        self.shuffle_tags = shuffle_tags
+        self.seed = seed
+        self.epoch = torch.zeros((), dtype=torch.int64).share_memory_()
+        self.open()
+
+    def open(self):
+        self.input_ids = np.load(os.path.join(self.path, "input_ids.npy"), mmap_mode="r")
+        self.input_offsets = np.load(os.path.join(self.path, "input_ids_offsets.npy"), mmap_mode="r")
+        self.labels = np.load(os.path.join(self.path, "labels.npy"), mmap_mode="r")
+        self.label_offsets = np.load(os.path.join(self.path, "labels_offsets.npy"), mmap_mode="r")
+        self.tag_ids = np.load(os.path.join(self.path, "tag_ids.npy"), mmap_mode="r")
+        self.tag_offsets = np.load(os.path.join(self.path, "tag_ids_offsets.npy"), mmap_mode="r")
+        self.vocabulary = TagVocabulary.load(self.path)
+        self.tag_tokens = np.load(os.path.join(self.path, "tag_tokens.npy"), mmap_mode="r")
+        self.tag_token_offsets = np.load(os.path.join(self.path, "tag_tokens_offsets.npy"), mmap_mode="r")
+        self.composable = np.load(os.path.join(self.path, "composable.npy"), mmap_mode="r")
+        self.spans = None
+        with open(os.path.join(self.path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+    def __getstate__(self):
+        return {"path": self.path, "shuffle_tags": self.shuffle_tags, "seed": self.seed, "epoch": self.epoch}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.open()
+
+    def set_epoch(self, epoch):
+        self.epoch.fill_(epoch)
+
+    def __len__(self):
+        return len(self.input_offsets) - 1
+
+    def __getitem__(self, idx):
+        if self.shuffle_tags and self.composable[idx]:
+            tag_ids = self.tags(idx).tolist()
+            random.Random(f"{self.seed}-{int(self.epoch)}-{idx}").shuffle(tag_ids)
+            input_ids = np.array(self.compose(tag_ids), dtype=np.int64)
+        else:
+            input_ids = np.array(self.input_ids[self.input_offsets[idx]:self.input_offsets[idx + 1]], dtype=np.int64)
+        return {
+            "input_ids": input_ids,
+            "labels": np.array(self.labels[self.label_offsets[idx]:self.label_offsets[idx + 1]], dtype=np.int64),
+        }
+
+    # Input token ids for the given tags, in that order
+    def compose(self, tag_ids):
+        if self.spans is None:
+            # Unpacked once per process: slicing the memory map for every tag costs more than the rest
+            self.spans = [span.tolist() for span in np.split(np.asarray(self.tag_tokens), self.tag_token_offsets[1:-1])]
+        return compose_input([self.spans[tag_id] for tag_id in tag_ids], self.meta["separator_ids"], self.meta["eos_token_id"], self.meta["max_input_length"])
+
+    # Tag ids of an example's input (render with self.vocabulary.decode())
+    def tags(self, idx):
+        return np.array(self.tag_ids[self.tag_offsets[idx]:self.tag_offsets[idx + 1]])
+
+    # Token length of every input, for BucketBatchSampler
+    def input_lengths(self):
+        return np.diff(self.input_offsets).tolist()
+
+# Expands glob patterns into a sorted list of shard paths
+def expand_shards(patterns):
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            raise FileNotFoundError(f"no files match {pattern}")
+        paths.extend(matches)
+    return paths
+
+# Yields (tags, description) pairs from one JSONL, CSV or Parquet shard without loading it whole
+def read_shard(path, tags_field="tags", description_field="description"):
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("reading .parquet shards requires pyarrow (pip install pyarrow)") from None
+        for batch in pq.ParquetFile(path).iter_batches(columns=[tags_field, description_field]):
+            columns = batch.to_pydict()
+            yield from zip(columns[tags_field], columns[description_field])
+    elif path.endswith(".csv"):
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                yield row[tags_field], row[description_field]
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    yield (row[tags_field], row[description_field]) if isinstance(row, dict) else tuple(row)
+
+def shuffle_tag_order(tags, rng):
+    tag_list = [tag.strip() for tag in tags.split(",")]
+    rng.shuffle(tag_list)
+    return ", ".join(tag_list)
+
+# Fills a buffer of buffer_size items and yields a random one each time a new item arrives
+def shuffle_buffer(items, buffer_size, rng):
+    buffer = []
+    for item in items:
+        if len(buffer) < buffer_size:
+            buffer.append(item)
+            continue
+        i = rng.randrange(buffer_size)
+        yield buffer[i]
+        buffer[i] = item
+    rng.shuffle(buffer)
+    yield from buffer
+
+# Streams (tags, description) pairs from JSONL/CSV/Parquet shards and tokenizes them in chunks, so memory
+# stays bounded by shuffle_buffer_size regardless of corpus size. Each DataLoader worker reads its own
+# subset of shards (or every num_workers-th row when there are fewer shards than workers).
+# Call set_epoch() before each epoch to get a different shard order and shuffle. With shuffle_tags, each
+# example's tags are also put in a new order every epoch. `normalize`, if given, maps a list of tag
+# strings to normalized ones (e.g. normalize.normalize_batch) before tokenization.
+class StreamingDataset(IterableDataset):
+    def __init__(self, patterns, tokenizer, max_input_length, max_output_length, shuffle=True, shuffle_buffer_size=10000,
+                 seed=0, tags_field="tags", description_field="description", chunk_size=256, normalize=None, shuffle_tags=False):
+        self.paths = expand_shards(patterns)
+        self.tokenizer = tokenizer
+        self.max_input_length = max_input_length
+        self.max_output_length = max_output_length
+        self.shuffle = shuffle
+        self.shuffle_buffer_size = shuffle_buffer_size
+        self.seed = seed
+        self.tags_field = tags_field
+        self.description_field = description_field
+        self.chunk_size = chunk_size
+        self.normalize = normalize
+        self.shuffle_tags = shuffle_tags
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def worker_pairs(self):
+        worker_info = get_worker_info()
+        worker_id, num_workers = (worker_info.id, worker_info.num_workers) if worker_info else (0, 1)
+        # Persistent workers keep their own copy of the dataset and never see set_epoch(),
+        # so every pass also advances the epoch on whichever copy is iterating
+        epoch = self.epoch
+        self.epoch += 1
+        rng = random.Random(f"{self.seed}-{epoch}-{worker_id}")
+        paths = list(self.paths)
+        if self.shuffle:
+            random.Random(f"{self.seed}-{epoch}").shuffle(paths)
+
+        if len(paths) >= num_workers:
+            pairs = itertools.chain.from_iterable(
+                read_shard(path, self.tags_field, self.description_field) for path in paths[worker_id::num_workers]
+            )
+        else:
+            pairs = itertools.chain.from_iterable(read_shard(path, self.tags_field, self.description_field) for path in paths)
+            pairs = itertools.islice(pairs, worker_id, None, num_workers)
+
+        if self.shuffle_tags:
+            tag_rng = random.Random(f"{self.seed}-{epoch}-{worker_id}-tags")
+            pairs = ((shuffle_tag_order(tags, tag_rng), description) for tags, description in pairs)
+        if self.shuffle:
+            pairs = shuffle_buffer(pairs, self.shuffle_buffer_size, rng)
+        return pairs
+
+    def __iter__(self):
+        pairs = self.worker_pairs()
+        while True:
+            chunk = list(itertools.islice(pairs, self.chunk_size))
+            if not chunk:
+                return
+            tags = [tags for tags, _ in chunk]
+            if self.normalize is not None:
+                tags = self.normalize(tags)
+            input_ids = self.tokenizer(tags, max_length=self.max_input_length, truncation=True).input_ids
+            labels = self.tokenizer([description for _, description in chunk], max_length=self.max_output_length, truncation=True).input_ids
+            for ids, label_ids in zip(input_ids, labels):
+                yield {"input_ids": ids, "labels": label_ids}
@@ -0,0 +1,37 @@
+import argparse
+
+from inference import MODEL_NAME, MODEL_PATH, QUANTIZED_PATH, SAFETENSORS_PATH
+from modeling import export_quantized, export_safetensors
+from onnx_backend import ONNX_DIR
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the fine-tuned model to other formats")
+    subparsers = parser.add_subparsers(dest="format", required=True)
+
+    safetensors_parser = subparsers.add_parser("safetensors", help="Memory-mappable weights that load without the pretrained checkpoint")
+    safetensors_parser.add_argument("--weights", type=str, default=MODEL_PATH, help="torch.save()d state_dict to convert")
+    safetensors_parser.add_argument("--output", type=str, default=SAFETENSORS_PATH)
+
+    quantized_parser = subparsers.add_parser("quantized", help="Dynamic int8 quantized weights for CPU inference")
+    quantized_parser.add_argument("--weights", type=str, default=MODEL_PATH, help="Fine-tuned weights (.pth or .safetensors)")
+    quantized_parser.add_argument("--model-name", type=str, default=MODEL_NAME)
+    quantized_parser.add_argument("--output", type=str, default=QUANTIZED_PATH)
+
+    onnx_parser = subparsers.add_parser("onnx", help="Encoder and decoder-with-past graphs for ONNX Runtime (CPU)")
+    onnx_parser.add_argument("--weights", type=str, default=MODEL_PATH, help="Fine-tuned weights (.pth or .safetensors)")
+    onnx_parser.add_argument("--model-name", type=str, default=MODEL_NAME)
+    onnx_parser.add_argument("--output", type=str, default=ONNX_DIR, help="Output directory")
+
+    args = parser.parse_args()
+
+    if args.format == "safetensors":
+        export_safetensors(args.weights, args.output)
+        print(f"Wrote {args.output}")
+    elif args.format == "quantized":
+        export_quantized(args.model_name, args.weights, args.output)
+        print(f"Wrote {args.output}")
+    elif args.format == "onnx":
+        from onnx_export import export_onnx
+
+        export_onnx(args.model_name, args.weights, args.output)
+        print(f"Wrote {args.output}")
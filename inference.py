@@ -1,36 +1,258 @@
-import torch
-from transformers import T5ForConditionalGeneration, T5Tokenizer
 import argparse
+import itertools
+import json
+import os
+import sys
+
+from modeling import QUANTIZED_SUFFIX, default_device, load_model, load_tokenizer
 
 MAX_INPUT_LENGTH = 128
 MAX_OUTPUT_LENGTH = 64
 MODEL_NAME = "google-t5/t5-base"
+MODEL_PATH = "tags_to_description_model.pth"
+# Written by `python3 export.py safetensors`; loaded instead of MODEL_PATH when present
+SAFETENSORS_PATH = "tags_to_description_model.safetensors"
+# Written by `python3 export.py quantized`; used with quantized=True / --quantized (CPU only)
+QUANTIZED_PATH = "tags_to_description_model.int8.pt"
 BEAM_SIZE = 8
-DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+BATCH_SIZE = 32
+# describe_stream() sorts this many batches at a time by length before generating
+STREAM_WINDOW_BATCHES = 16
+# Only applied on CUDA, where tensor cores prefer multiples of 8
+PAD_TO_MULTIPLE_OF = 8
+# Decoding presets, fastest first. Values are model.generate() keyword arguments; "quality" is what
+# inference has always used. Options passed to decoding_options() override the preset's.
+DECODING_PRESETS = {
+    "fast": {"num_beams": 1},
+    "balanced": {"num_beams": 4, "early_stopping": True},
+    "quality": {"num_beams": BEAM_SIZE, "early_stopping": True},
+    "sample": {"do_sample": True, "top_p": 0.9, "temperature": 0.7},
+}
+DEFAULT_DECODING = "quality"
+# Descriptions kept in memory by make_generator(); 0 disables the cache
+CACHE_SIZE = 10000
+# Optional SQLite file that keeps cached descriptions across restarts
+CACHE_PATH = None
+
+# Loads the fine-tuned model and tokenizer once and keeps them around between calls.
+# An already loaded model/tokenizer pair (e.g. right after training) can be passed in instead.
+class DescriptionGenerator:
+    def __init__(self, model_path=None, model_name=MODEL_NAME, device=None, fast_tokenizer=True, model=None, tokenizer=None, quantized=False, decoding=None):
+        from dataset import DynamicPaddingCollator
+
+        if quantized:
+            import torch
+
+            device = torch.device("cpu")
+            model_path = quantized_model_path(model_path)
+        self.device = device or default_device()
+        self.tokenizer = tokenizer or load_tokenizer(model_name, fast=fast_tokenizer)
+        self.model = model or load_model(model_name, weights_path=model_path or default_model_path(), device=self.device)
+        self.model.eval()
+        self.decoding = decoding or decoding_options()
+        self.collate_fn = DynamicPaddingCollator(self.tokenizer.pad_token_id, pad_to_multiple_of=PAD_TO_MULTIPLE_OF if self.device.type == "cuda" else None)
+
+    def generate(self, input_text):
+        return self.generate_batch([input_text])[0]
+
+    def generate_batch(self, input_texts, batch_size=BATCH_SIZE, decoding=None):
+        import torch
+        from dataset import BucketBatchSampler
+        from normalize import normalize_batch
+
+        if not input_texts:
+            return []
+        decoding = decoding or self.decoding
+        # max_new_tokens, when given, replaces the default output length limit
+        if "max_new_tokens" not in decoding:
+            decoding = {"max_length": MAX_OUTPUT_LENGTH, **decoding}
+
+        # Same tag normalization as in training
+        input_ids = self.tokenizer(normalize_batch(list(input_texts)), max_length=MAX_INPUT_LENGTH, truncation=True).input_ids
+        descriptions = [None] * len(input_ids)
+        # Similar-length inputs share a batch; results are written back in input order
+        for indices in BucketBatchSampler([len(ids) for ids in input_ids], batch_size, shuffle=False):
+            input_encoding = self.collate_fn([{"input_ids": input_ids[i]} for i in indices])
+            with torch.no_grad():
+                outputs = self.model.generate(
+                    input_ids=input_encoding["input_ids"].to(self.device),
+                    attention_mask=input_encoding["attention_mask"].to(self.device),
+                    **decoding
+                )
+            for i, description in zip(indices, self.tokenizer.batch_decode(outputs, skip_special_tokens=True)):
+                descriptions[i] = description
+        return descriptions
+
+# A preset from DECODING_PRESETS with individual options overridden (None leaves the preset's value)
+def decoding_options(preset=DEFAULT_DECODING, **overrides):
+    if preset not in DECODING_PRESETS:
+        raise ValueError(f"unknown decoding preset {preset!r}, expected one of {', '.join(DECODING_PRESETS)}")
+    options = {**DECODING_PRESETS[preset], **{name: value for name, value in overrides.items() if value is not None}}
+    if options.get("num_beams", 1) == 1:
+        options.pop("early_stopping", None)
+    return options
+
+def add_decoding_arguments(parser):
+    parser.add_argument("--decoding", type=str, default=DEFAULT_DECODING, choices=list(DECODING_PRESETS), help="Decoding preset (fast: greedy, balanced: 4 beams, quality: 8 beams, sample: nucleus sampling)")
+    parser.add_argument("--num-beams", type=int, default=None, help="Override the preset's beam width (1 = greedy)")
+    parser.add_argument("--sample", action="store_true", default=None, help="Sample instead of searching")
+    parser.add_argument("--temperature", type=float, default=None)
+    parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--top-p", type=float, default=None)
+    parser.add_argument("--length-penalty", type=float, default=None, help="Beam search: >1 favours longer, <1 shorter descriptions")
+    parser.add_argument("--max-new-tokens", type=int, default=None, help=f"Limit on generated tokens (default {MAX_OUTPUT_LENGTH - 1})")
+
+def decoding_from_args(args):
+    return decoding_options(
+        args.decoding,
+        num_beams=args.num_beams,
+        do_sample=args.sample,
+        temperature=args.temperature,
+        top_k=args.top_k,
+        top_p=args.top_p,
+        length_penalty=args.length_penalty,
+        max_new_tokens=args.max_new_tokens,
+    )
+
+# The safetensors export loads faster and with half the memory, so prefer it when it exists
+def default_model_path():
+    return SAFETENSORS_PATH if os.path.exists(SAFETENSORS_PATH) else MODEL_PATH
+
+# Weights for quantized=True: QUANTIZED_PATH by default. Anything but an int8 export is refused rather
+# than quietly loaded as fp32.
+def quantized_model_path(model_path=None):
+    model_path = model_path or QUANTIZED_PATH
+    if not model_path.endswith(QUANTIZED_SUFFIX):
+        raise ValueError(f"{model_path} is not an int8 export (*{QUANTIZED_SUFFIX}); write one with `python3 export.py quantized`")
+    return model_path
+
+# Splits any iterable into lists of at most batch_size items
+def iter_batches(items, batch_size):
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+# Generator used by the CLI, server and module-level helpers: PyTorch (model.generate(), the
+# shared_kv engine, or a pool of `workers` CPU processes) or ONNX Runtime, behind a cache of descriptions keyed on the
+# (order-independent) tag set unless cache_size is 0
+def make_generator(quantized=False, onnx=False, model_path=None, decoding=None, cache_size=CACHE_SIZE, cache_path=CACHE_PATH, workers=0, threads_per_worker=None, shared_kv=False):
+    from cache import CachedGenerator, DescriptionCache
+
+    if sum(map(bool, (onnx, workers, shared_kv))) > 1:
+        raise ValueError("onnx, workers and shared_kv are separate backends; pick one")
+    if onnx:
+        from onnx_backend import DECODER_FILE, ONNX_DIR, OnnxDescriptionGenerator
+
+        generator = OnnxDescriptionGenerator(decoding=decoding)
+        weights_path = os.path.join(ONNX_DIR, DECODER_FILE)
+    else:
+        weights_path = quantized_model_path(model_path) if quantized else model_path or default_model_path()
+    if shared_kv:
+        from shared_kv import SharedKVDescriptionGenerator
+
+        generator = SharedKVDescriptionGenerator(model_path=weights_path, quantized=quantized, decoding=decoding)
+    elif workers:
+        from pool import DescriptionPool
+
+        generator = DescriptionPool(workers, threads_per_worker, model_path=weights_path, quantized=quantized, decoding=decoding)
+    elif not onnx:
+        generator = DescriptionGenerator(model_path=weights_path, quantized=quantized, decoding=decoding)
+    if cache_size <= 0:
+        return generator
+    # The pool runs the same model.generate() as DescriptionGenerator, so they share cache entries
+    backend = "onnx" if onnx else "shared_kv" if shared_kv else "torch"
+    return CachedGenerator(generator, DescriptionCache(cache_size, cache_path), model_fingerprint(backend, weights_path))
+
+# Identifies the model behind a cached generator: the backend and the weights file's path, size and
+# modification time. Part of every cache key, so a --cache-path file used with another backend or
+# after retraining never answers with another model's descriptions.
+def model_fingerprint(backend, weights_path):
+    stat = os.stat(weights_path)
+    return json.dumps([backend, os.path.abspath(weights_path), stat.st_size, stat.st_mtime_ns])
+
+_generator = None
+
+# Shared generator for the module-level helpers, created on first use
+def get_generator():
+    global _generator
+    if _generator is None:
+        _generator = make_generator()
+    return _generator
 
 def generate_description(input_text):
-    model = T5ForConditionalGeneration.from_pretrained(MODEL_NAME).to(DEVICE)
-    tokenizer = T5Tokenizer.from_pretrained(MODEL_NAME)
-    model.load_state_dict(torch.load("tags_to_description_model.pth"))
-    model.eval()
-    input_encoding = tokenizer(input_text, max_length=MAX_INPUT_LENGTH, padding="max_length", truncation=True, return_tensors="pt").to(DEVICE)
-    with torch.no_grad():
-        outputs = model.generate(
-            input_ids=input_encoding.input_ids,
-            attention_mask=input_encoding.attention_mask,
-            max_length=MAX_OUTPUT_LENGTH,
-            num_beams=BEAM_SIZE,
-            early_stopping=True
-        )
-    return tokenizer.decode(outputs[0], skip_special_tokens=True)
+    return get_generator().generate(input_text)
+
+def generate_descriptions(input_texts, batch_size=BATCH_SIZE):
+    return get_generator().generate_batch(input_texts, batch_size)
+
+# Plain lines become {"tags": line}; JSONL lines are objects with a "tags" field (or bare strings)
+# Errors name the file (its .name, e.g. <stdin>) and the line, so a bad line in a large file can be found
+def read_records(lines, jsonl=False):
+    path = getattr(lines, "name", "<input>")
+    for line_number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if not jsonl:
+            yield {"tags": line}
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"{path}, line {line_number}: malformed JSON ({error})") from None
+        if isinstance(record, str):
+            record = {"tags": record}
+        if not isinstance(record, dict) or "tags" not in record:
+            raise ValueError(f"{path}, line {line_number}: expected a string or an object with a \"tags\" field")
+        if not isinstance(record["tags"], str):
+            raise ValueError(f"{path}, line {line_number}: \"tags\" must be a string")
+        yield record
+
+# Streams descriptions for a file of tag strings, a window of length-sorted batches at a time
+def describe_stream(generator, lines, out, batch_size=BATCH_SIZE, jsonl=False):
+    for records in iter_batches(read_records(lines, jsonl), batch_size * STREAM_WINDOW_BATCHES):
+        descriptions = generator.generate_batch([record["tags"] for record in records], batch_size)
+        for record, description in zip(records, descriptions):
+            if jsonl:
+                out.write(json.dumps({**record, "description": description}) + "\n")
+            else:
+                out.write(description + "\n")
+        out.flush()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate description from input tags")
-    parser.add_argument("input_tags", type=str, help="Input tags separated by commas")
+    parser.add_argument("input_tags", type=str, nargs="?", help="Input tags separated by commas")
+    parser.add_argument("--file", type=str, default=None, help="Read tag strings from this file ('-' for stdin), one per line")
+    parser.add_argument("--jsonl", action="store_true", help="With --file: read and write JSON lines with a \"tags\" field")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Number of tag strings per generate() call")
+    parser.add_argument("--quantized", action="store_true", help=f"Run the int8 CPU model from {QUANTIZED_PATH}")
+    parser.add_argument("--onnx", action="store_true", help="Run the ONNX Runtime export (see export.py onnx) instead of PyTorch")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="Descriptions cached in memory by tag set (0 disables)")
+    parser.add_argument("--cache-path", type=str, default=CACHE_PATH, help="SQLite file that keeps cached descriptions across runs")
+    parser.add_argument("--shared-kv", action="store_true", help="CPU engine that computes encoder states once per input for all beams (see shared_kv.py)")
+    parser.add_argument("--workers", type=int, default=0, help="With --file: run on this many CPU worker processes sharing the safetensors weights")
+    parser.add_argument("--threads-per-worker", type=int, default=None, help="torch threads in each worker (default: available cores / workers)")
+    add_decoding_arguments(parser)
     
     args = parser.parse_args()
+    if (args.input_tags is None) == (args.file is None):
+        parser.error("pass either input_tags or --file")
+    
+    generator = make_generator(quantized=args.quantized, onnx=args.onnx, decoding=decoding_from_args(args), cache_size=args.cache_size, cache_path=args.cache_path, workers=args.workers, threads_per_worker=args.threads_per_worker, shared_kv=args.shared_kv)
+    if args.file is not None:
+        if args.file == "-":
+            describe_stream(generator, sys.stdin, sys.stdout, args.batch_size, args.jsonl)
+        else:
+            with open(args.file, encoding="utf-8") as f:
+                describe_stream(generator, f, sys.stdout, args.batch_size, args.jsonl)
+        if args.cache_size > 0:
+            print(f"Cache: {json.dumps(generator.cache.stats())}", file=sys.stderr)
+        sys.exit(0)
     
-    generated_description = generate_description(args.input_tags)
+    generated_description = generator.generate(args.input_tags)
     
     print(f"Input: {args.input_tags}")
-    print(f"Generated description: {generated_description}")
\ No newline at end of file
+    print(f"Generated description: {generated_description}")
@@ -0,0 +1,112 @@
+import itertools
+
+QUANTIZED_SUFFIX = ".int8.pt"
+
+# torch and transformers are imported inside the functions so importing this module stays cheap
+
+def default_device():
+    import torch
+
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# Rust-backed T5TokenizerFast by default; fast=False gives the slow SentencePiece T5Tokenizer.
+# benchmarks/compare_tokenizers.py checks both produce identical ids on the training corpus.
+def load_tokenizer(model_name, fast=True):
+    from transformers import T5Tokenizer, T5TokenizerFast
+
+    tokenizer_class = T5TokenizerFast if fast else T5Tokenizer
+    return tokenizer_class.from_pretrained(model_name)
+
+# Pretrained T5, optionally with fine-tuned weights, moved to device. Weights in a .safetensors
+# file skip the pretrained checkpoint entirely (see load_safetensors_model), *.int8.pt files are
+# int8 exports from export_quantized() (CPU only); anything else is treated as a torch.save()d
+# state_dict and loaded over the pretrained model.
+def load_model(model_name, weights_path=None, device=None):
+    import torch
+    from transformers import T5ForConditionalGeneration
+
+    device = device or default_device()
+    if weights_path and weights_path.endswith(".safetensors"):
+        return load_safetensors_model(model_name, weights_path, device)
+    if weights_path and weights_path.endswith(QUANTIZED_SUFFIX):
+        if device.type != "cpu":
+            raise ValueError("int8 quantized models only run on CPU")
+        return load_quantized_model(model_name, weights_path)
+
+    model = T5ForConditionalGeneration.from_pretrained(model_name)
+    if weights_path:
+        model.load_state_dict(torch.load(weights_path, map_location="cpu"))
+    return model.to(device)
+
+# Builds the model on the meta device (no allocation, no random init), then assigns the
+# memory-mapped tensors from the safetensors file as its parameters. Only the config is read
+# from model_name, so there is a single copy of the weights and no pickle to parse.
+def load_safetensors_model(model_name, weights_path, device):
+    import torch
+    from safetensors.torch import load_file
+    from transformers import T5Config, T5ForConditionalGeneration
+
+    config = T5Config.from_pretrained(model_name)
+    with torch.device("meta"):
+        model = T5ForConditionalGeneration(config)
+    # Tied weights (embed_tokens, lm_head) are not stored and come back through tie_weights()
+    model.load_state_dict(load_file(weights_path, device=str(device)), strict=False, assign=True)
+    model.tie_weights()
+    missing = [name for name, tensor in itertools.chain(model.named_parameters(), model.named_buffers()) if tensor.is_meta]
+    if missing:
+        raise ValueError(f"{weights_path} is missing weights for: {', '.join(missing)}")
+    # Match from_pretrained(), which returns models in eval mode
+    return model.eval().to(device)
+
+# Writes a state_dict as safetensors, storing tensors that share memory (tied weights) only once
+def save_safetensors(state_dict, path):
+    from safetensors.torch import save_file
+
+    tensors = {}
+    seen = set()
+    for name, tensor in state_dict.items():
+        if tensor.data_ptr() in seen:
+            continue
+        seen.add(tensor.data_ptr())
+        tensors[name] = tensor.detach().cpu().contiguous()
+    save_file(tensors, path, metadata={"format": "pt"})
+
+# Converts a torch.save()d state_dict (e.g. tags_to_description_model.pth) to safetensors
+def export_safetensors(weights_path, output_path):
+    import torch
+
+    save_safetensors(torch.load(weights_path, map_location="cpu"), output_path)
+
+# Dynamic int8 quantization: every nn.Linear keeps int8 weights and quantizes its input on the fly.
+# Embeddings and layer norms stay fp32. Runs on CPU only.
+def quantize_model(model):
+    import torch
+
+    return torch.ao.quantization.quantize_dynamic(model.to("cpu"), {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+# Quantizes the fine-tuned model and saves its state_dict (packed int8 weights) to output_path
+def export_quantized(model_name, weights_path, output_path):
+    import torch
+
+    model = quantize_model(load_model(model_name, weights_path, device=torch.device("cpu")))
+    torch.save(model.state_dict(), output_path)
+
+# Rebuilds the quantized module structure without ever materializing fp32 Linear weights:
+# Linear layers are swapped for empty int8 ones on the meta model, the remaining parameters
+# get uninitialized CPU storage, and the exported state_dict fills in everything.
+def load_quantized_model(model_name, weights_path):
+    import torch
+    from torch.ao.nn.quantized.dynamic import Linear as QuantizedLinear
+    from transformers import T5Config, T5ForConditionalGeneration
+
+    config = T5Config.from_pretrained(model_name)
+    with torch.device("meta"):
+        model = T5ForConditionalGeneration(config)
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if type(child) is torch.nn.Linear:
+                setattr(parent, name, QuantizedLinear(child.in_features, child.out_features, bias_=child.bias is not None, dtype=torch.qint8))
+    model.to_empty(device="cpu")
+    # Packed int8 weights are not plain tensors, so this file needs the full unpickler
+    model.load_state_dict(torch.load(weights_path, map_location="cpu", weights_only=False))
+    return model.eval()
@@ -0,0 +1,120 @@
+import itertools
+import json
+import threading
+
+# Spellings that mean the same tag, after lowercasing and underscore/space unification.
+# Extend with load_aliases() for a project-specific table.
+ALIASES = {
+    "tshirt": "t-shirt",
+    "t shirt": "t-shirt",
+    "1 girl": "1girl",
+    "1 boy": "1boy",
+    "2 girls": "2girls",
+    "2 boys": "2boys",
+}
+# Drop a tag when a more specific one ends with it ("t-shirt, white t-shirt" -> "white t-shirt")
+DROP_IMPLIED = True
+# Separator for normalize_batch(); it is removed from tag strings (both paths), so input can't fake a row boundary
+BATCH_SEPARATOR = "\x00"
+# Distinct raw tags remembered before the memo starts over, so free-form input to a long-running
+# server can't grow it without bound (0 never clears it)
+MAX_MEMO_SIZE = 200000
+UNIFY_SPACES = str.maketrans({"_": " ", "\t": " ", "\n": " ", "\r": " "})
+
+# A JSON object of {"alias": "tag"} pairs, merged over ALIASES
+def load_aliases(path):
+    with open(path, encoding="utf-8") as f:
+        return {**ALIASES, **json.load(f)}
+
+# Normalizes comma-separated tag strings the same way for training and inference: trim, lowercase,
+# underscores -> spaces, collapse whitespace, apply aliases, drop duplicates (and implied tags).
+# Tag order is kept. Results per distinct raw tag are memoized, since the same tags recur constantly;
+# the memo is cleared between calls once it holds more than max_memo_size tags. Calls hold a lock, so
+# threads sharing a normalizer (default_normalizer in the server) never see a half-updated or
+# just-cleared memo; normalization is pure Python under the GIL, so little parallelism is lost.
+class TagNormalizer:
+    def __init__(self, aliases=None, drop_implied=DROP_IMPLIED, max_memo_size=MAX_MEMO_SIZE):
+        self.aliases = {self.clean(alias): self.clean(tag) for alias, tag in (ALIASES if aliases is None else aliases).items()}
+        self.drop_implied = drop_implied
+        self.max_memo_size = max_memo_size
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        # The separator maps to itself so normalize_batch() can find row boundaries after the lookup
+        self.memo = {BATCH_SEPARATOR: BATCH_SEPARATOR}
+        self.suffixes = {}
+        # Every tag that is a word-aligned suffix of some tag seen so far, i.e. could be implied
+        self.implied_tags = set()
+
+    # Only called before a string or batch is normalized: join() needs the suffixes of all its tags
+    def limit_memo(self):
+        if self.max_memo_size and len(self.memo) > self.max_memo_size:
+            self.clear()
+
+    @staticmethod
+    def clean(tag):
+        return " ".join(tag.lower().translate(UNIFY_SPACES).split())
+
+    def normalize_tag(self, tag):
+        normalized = self.memo.get(tag)
+        if normalized is None:
+            normalized = self.clean(tag)
+            normalized = self.memo[tag] = self.aliases.get(normalized, normalized)
+            words = normalized.split(" ")
+            self.suffixes[normalized] = [" ".join(words[i:]) for i in range(1, len(words))]
+            self.implied_tags.update(self.suffixes[normalized])
+        return normalized
+
+    def __call__(self, tags):
+        with self.lock:
+            self.limit_memo()
+            return self.join([self.normalize_tag(tag) for tag in tags.replace(BATCH_SEPARATOR, "").split(",")])
+
+    # Lowercases and splits the whole batch as one string, maps every tag through the memo with a
+    # single map() call and only then regroups the tags by row, so the per-string Python work is
+    # reduced to deduplication
+    def normalize_batch(self, tag_strings):
+        if not tag_strings:
+            return []
+        with self.lock:
+            self.limit_memo()
+            return self.normalize_rows(tag_strings)
+
+    def normalize_rows(self, tag_strings):
+        separator = f",{BATCH_SEPARATOR},"
+        text = separator.join(tag_strings)
+        if text.count(BATCH_SEPARATOR) != len(tag_strings) - 1:
+            text = separator.join(tags.replace(BATCH_SEPARATOR, "") for tags in tag_strings)
+        raw_tags = text.lower().translate(UNIFY_SPACES).split(",")
+        tags = list(map(self.memo.get, raw_tags))
+        if None in tags:
+            tags = [tag if tag is not None else self.normalize_tag(raw) for tag, raw in zip(tags, raw_tags)]
+        ends = list(itertools.compress(itertools.count(), map(BATCH_SEPARATOR.__eq__, tags)))
+        starts = [0] + [end + 1 for end in ends]
+        ends.append(len(tags))
+        # Callers match rows to inputs by position
+        if len(starts) != len(tag_strings):
+            raise ValueError(f"normalize_batch() split {len(tag_strings)} tag strings into {len(starts)} rows")
+        return [self.join(tags[start:end]) for start, end in zip(starts, ends)]
+
+    # Deduplicates already normalized tags, keeping the first occurrence, and drops implied ones
+    def join(self, tags):
+        tags = dict.fromkeys(tags)
+        tags.pop("", None)
+        if self.drop_implied and not self.implied_tags.isdisjoint(tags):
+            implied = set(itertools.chain.from_iterable(map(self.suffixes.__getitem__, tags)))
+            return ", ".join(tag for tag in tags if tag not in implied)
+        return ", ".join(tags)
+
+default_normalizer = TagNormalizer()
+
+def normalize_tags(tags):
+    return default_normalizer(tags)
+
+def normalize_batch(tag_strings):
+    return default_normalizer.normalize_batch(tag_strings)
+
+def normalize_pairs(pairs):
+    pairs = list(pairs)
+    return list(zip(normalize_batch([tags for tags, _ in pairs]), [description for _, description in pairs]))
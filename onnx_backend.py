@@ -0,0 +1,221 @@
+import json
+import os
+
+import numpy as np
+
+from inference import BATCH_SIZE, MAX_INPUT_LENGTH, MAX_OUTPUT_LENGTH, decoding_options
+from modeling import load_tokenizer
+from normalize import normalize_batch
+
+ONNX_DIR = "tags_to_description_onnx"
+ENCODER_FILE = "encoder.onnx"
+DECODER_FILE = "decoder_with_past.onnx"
+# Decoding options (see inference.DECODING_PRESETS) that the numpy search loops implement
+SUPPORTED_DECODING = {"num_beams", "early_stopping", "length_penalty", "max_new_tokens"}
+# Name of the decoder's per-input batch axis (cross_key_values, encoder_attention_mask), which is
+# num_beams times smaller than its per-beam one; exports from before beams shared them don't have it
+SOURCE_BATCH = "source_batch"
+# Decoding steps the self-attention cache has room for at first; it doubles whenever it fills up
+CACHE_LENGTH = 16
+# Added to the scores of beams that must not be picked, as in transformers' beam search
+NEG_INF = np.float32(-1.0e9)
+
+# Raises ValueError for decoding options the numpy search loops don't implement (sampling)
+def check_decoding(decoding):
+    unsupported = set(decoding) - SUPPORTED_DECODING
+    if unsupported:
+        raise ValueError(f"the ONNX Runtime and shared_kv backends do not support decoding options: {', '.join(sorted(unsupported))}")
+
+def log_softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    logits -= np.log(np.exp(logits).sum(axis=-1, keepdims=True))
+    return logits
+
+# Indices of the k largest values along the last axis, largest first
+def top_k(scores, k):
+    indices = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    order = np.argsort(-np.take_along_axis(scores, indices, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(indices, order, axis=-1)
+
+# Runs the graphs written by `python3 export.py onnx` with ONNX Runtime on CPU. Same generate() /
+# generate_batch() interface as inference.DescriptionGenerator, without torch. num_beams=1 is
+# greedy search; otherwise beam search follows model.generate(). Sampling is not supported.
+class OnnxDescriptionGenerator:
+    def __init__(self, onnx_dir=ONNX_DIR, decoding=None, threads=None):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.encoder = onnxruntime.InferenceSession(os.path.join(onnx_dir, ENCODER_FILE), options, providers=["CPUExecutionProvider"])
+        self.decoder = onnxruntime.InferenceSession(os.path.join(onnx_dir, DECODER_FILE), options, providers=["CPUExecutionProvider"])
+        cross_input, = [node for node in self.decoder.get_inputs() if node.name == "cross_key_values"]
+        if cross_input.shape[2] != SOURCE_BATCH:
+            raise ValueError(f"{onnx_dir} was exported by an older version; run `python3 export.py onnx` again")
+        with open(os.path.join(onnx_dir, "config.json")) as f:
+            config = json.load(f)
+        self.tokenizer = load_tokenizer(onnx_dir)
+        self.decoder_start_token_id = config["decoder_start_token_id"]
+        self.eos_token_id = config["eos_token_id"]
+        self.pad_token_id = config["pad_token_id"]
+        self.decoding = decoding or decoding_options()
+        # Rejected here rather than on every request
+        check_decoding(self.decoding)
+
+    def generate(self, input_text):
+        return self.generate_batch([input_text])[0]
+
+    def generate_batch(self, input_texts, batch_size=BATCH_SIZE, decoding=None):
+        if not input_texts:
+            return []
+        decoding = decoding or self.decoding
+        check_decoding(decoding)
+        input_ids = self.tokenizer(normalize_batch(list(input_texts)), max_length=MAX_INPUT_LENGTH, truncation=True).input_ids
+        # Decoding is deterministic, so inputs that tokenize the same are encoded and decoded once
+        unique_ids = list(dict.fromkeys(map(tuple, input_ids)))
+        found = {}
+        # Similar-length inputs share a batch
+        unique_ids.sort(key=len)
+        for start in range(0, len(unique_ids), batch_size):
+            batch = unique_ids[start:start + batch_size]
+            batch_ids, attention_mask = self.pad(batch)
+            sequences = self.generate_ids(batch_ids, attention_mask, decoding)
+            found.update(zip(batch, self.tokenizer.batch_decode(sequences, skip_special_tokens=True)))
+        return [found[tuple(ids)] for ids in input_ids]
+
+    # Right-pads to the longest sequence, as DynamicPaddingCollator does for the PyTorch path
+    def pad(self, sequences):
+        input_ids = np.full((len(sequences), max(len(ids) for ids in sequences)), self.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros(input_ids.shape, dtype=np.int64)
+        for row, ids in enumerate(sequences):
+            input_ids[row, :len(ids)] = ids
+            attention_mask[row, :len(ids)] = 1
+        return input_ids, attention_mask
+
+    def generate_ids(self, input_ids, attention_mask, decoding):
+        cross_key_values, = self.encoder.run(None, {"input_ids": input_ids, "attention_mask": attention_mask})
+        # Like model.generate(), max_length counts the decoder start token
+        max_length = decoding["max_new_tokens"] + 1 if "max_new_tokens" in decoding else MAX_OUTPUT_LENGTH
+        num_beams = decoding.get("num_beams", 1)
+        if num_beams == 1:
+            return self.greedy_search(attention_mask, cross_key_values, max_length)
+        return self.beam_search(
+            attention_mask, cross_key_values, max_length, num_beams,
+            length_penalty=decoding.get("length_penalty", 1.0),
+            early_stopping=decoding.get("early_stopping", False),
+        )
+
+    # Self-attention keys/values for `rows` decoder rows: (layers, 2, rows, heads, capacity, d_kv),
+    # filled along the length axis as steps are decoded
+    def empty_cache(self, cross_key_values, rows, capacity=CACHE_LENGTH):
+        layers, _, _, heads, _, d_kv = cross_key_values.shape
+        return np.empty((layers, 2, rows, heads, capacity, d_kv), dtype=cross_key_values.dtype)
+
+    # Decodes one step for each row's last token, attending to the first past_length entries of the
+    # cache, and writes this step's keys/values after them. Returns the logits and the cache, which is
+    # a new array when it had to grow.
+    def step(self, tokens, attention_mask, cross_key_values, cache, past_length):
+        logits, step_key_values = self.decoder.run(None, {
+            "input_ids": tokens[:, None],
+            "encoder_attention_mask": attention_mask,
+            "cross_key_values": cross_key_values,
+            "past_key_values": cache[:, :, :, :, :past_length],
+        })
+        if past_length == cache.shape[4]:
+            grown = np.empty(cache.shape[:4] + (2 * past_length,) + cache.shape[5:], dtype=cache.dtype)
+            grown[:, :, :, :, :past_length] = cache
+            cache = grown
+        cache[:, :, :, :, past_length] = step_key_values[:, :, :, :, 0]
+        return logits.astype(np.float32), cache
+
+    def greedy_search(self, attention_mask, cross_key_values, max_length):
+        batch_size = attention_mask.shape[0]
+        sequences = np.full((batch_size, 1), self.decoder_start_token_id, dtype=np.int64)
+        finished = np.zeros(batch_size, dtype=bool)
+        cache = self.empty_cache(cross_key_values, batch_size)
+        while sequences.shape[1] < max_length and not finished.all():
+            logits, cache = self.step(sequences[:, -1], attention_mask, cross_key_values, cache, sequences.shape[1] - 1)
+            tokens = np.where(finished, self.pad_token_id, logits.argmax(axis=-1))
+            sequences = np.concatenate([sequences, tokens[:, None]], axis=1)
+            finished |= tokens == self.eos_token_id
+        return sequences
+
+    # Makes row b of each input's beams hold the cache of the beam it continues (source_beams[i, b]).
+    # Beams only continue beams of the same input, so inputs are reordered one at a time in place,
+    # copying just the rows that change, instead of gathering the whole cache into a new array.
+    @staticmethod
+    def reorder_cache(cache, length, source_beams):
+        batch_size, num_beams = source_beams.shape
+        for first, sources in zip(range(0, batch_size * num_beams, num_beams), source_beams):
+            moved = [(first + beam, first + source) for beam, source in enumerate(sources) if beam != source]
+            # Copied out first, since a source row may itself be overwritten
+            copies = [cache[:, :, source, :, :length].copy() for _, source in moved]
+            for (row, _), copy in zip(moved, copies):
+                cache[:, :, row, :, :length] = copy
+
+    # Mirrors transformers' vectorized beam search so the results match the PyTorch path: keep the
+    # top 2 * num_beams continuations, finish those that end in EOS among the top num_beams, continue
+    # with the best num_beams unfinished ones. early_stopping is True or False (not "never").
+    def beam_search(self, attention_mask, cross_key_values, max_length, num_beams, length_penalty=1.0, early_stopping=False):
+        batch_size = attention_mask.shape[0]
+        beams_to_keep = 2 * num_beams
+        # The beams of an input are consecutive rows of the decoder batch. They all attend to the same
+        # row of cross_key_values and attention_mask, which stay at one row per input; only the
+        # self-attention cache has a row per beam.
+        cache = self.empty_cache(cross_key_values, batch_size * num_beams)
+
+        running_sequences = np.full((batch_size, num_beams, max_length), self.pad_token_id, dtype=np.int64)
+        running_sequences[:, :, 0] = self.decoder_start_token_id
+        running_scores = np.zeros((batch_size, num_beams), dtype=np.float32)
+        # Only the first beam is live at the start so the beams don't all pick the same tokens
+        running_scores[:, 1:] = NEG_INF
+        sequences = running_sequences.copy()
+        scores = np.full((batch_size, num_beams), NEG_INF, dtype=np.float32)
+        is_finished = np.zeros((batch_size, num_beams), dtype=bool)
+        can_improve = np.ones((batch_size, 1), dtype=bool)
+        is_top_beam = np.arange(beams_to_keep) < num_beams
+
+        length = 1
+        while True:
+            logits, cache = self.step(running_sequences[:, :, length - 1].reshape(-1), attention_mask, cross_key_values, cache, length - 1)
+            vocab_size = logits.shape[-1]
+            log_probs = log_softmax(logits).reshape(batch_size, num_beams, vocab_size)
+            log_probs += running_scores[:, :, None]
+            log_probs = log_probs.reshape(batch_size, num_beams * vocab_size)
+
+            topk_indices = top_k(log_probs, beams_to_keep)
+            topk_scores = np.take_along_axis(log_probs, topk_indices, axis=1)
+            topk_beams = topk_indices // vocab_size
+            topk_sequences = np.take_along_axis(running_sequences, topk_beams[:, :, None], axis=1)
+            topk_sequences[:, :, length] = topk_indices % vocab_size
+            hits_stop = (topk_sequences[:, :, length] == self.eos_token_id) | (length + 1 >= max_length)
+
+            # Best unfinished continuations keep running
+            running_topk_scores = topk_scores + hits_stop * NEG_INF
+            next_indices = top_k(running_topk_scores, num_beams)
+            running_sequences = np.take_along_axis(topk_sequences, next_indices[:, :, None], axis=1)
+            running_scores = np.take_along_axis(running_topk_scores, next_indices, axis=1)
+            source_beams = np.take_along_axis(topk_beams, next_indices, axis=1)
+
+            # Newly finished continuations compete with the finished ones for the num_beams slots
+            just_finished = hits_stop & is_top_beam[None, :]
+            finished_scores = topk_scores / np.float32(length ** length_penalty)
+            if early_stopping:
+                finished_scores += is_finished.all(axis=1, keepdims=True) * NEG_INF
+            finished_scores += ~can_improve * NEG_INF
+            finished_scores += ~just_finished * NEG_INF
+            merged_indices = top_k(np.concatenate([scores, finished_scores], axis=1), num_beams)
+            sequences = np.take_along_axis(np.concatenate([sequences, topk_sequences], axis=1), merged_indices[:, :, None], axis=1)
+            scores = np.take_along_axis(np.concatenate([scores, finished_scores], axis=1), merged_indices, axis=1)
+            is_finished = np.take_along_axis(np.concatenate([is_finished, just_finished], axis=1), merged_indices, axis=1)
+
+            self.reorder_cache(cache, length, source_beams)
+            length += 1
+
+            # An input is done once its best running beam can't beat its worst finished one
+            best_running = running_scores[:, :1] / np.float32((length - 1) ** length_penalty)
+            worst_finished = np.where(is_finished, scores.min(axis=1, keepdims=True), NEG_INF)
+            can_improve &= (best_running > worst_finished).any(axis=1, keepdims=True)
+            if not can_improve.any() or (early_stopping and is_finished.all()) or hits_stop.all():
+                break
+        return sequences[:, 0, :length]
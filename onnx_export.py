@@ -0,0 +1,154 @@
+import os
+
+import torch
+from transformers.models.t5.modeling_t5 import T5Attention
+
+from modeling import load_model, load_tokenizer
+from onnx_backend import DECODER_FILE, ENCODER_FILE, SOURCE_BATCH
+
+OPSET_VERSION = 17
+
+# Splits (batch, length, heads * d_kv) into (batch, heads, length, d_kv)
+def split_heads(attention, states):
+    return states.view(states.shape[0], -1, attention.n_heads, attention.key_value_proj_dim).transpose(1, 2)
+
+# T5 attention for precomputed keys/values (T5 does not scale the scores). key/value may have fewer
+# rows than hidden_states: each of their rows then serves that many consecutive query rows (the beams
+# of one input), which are folded into the query length so the keys and values are read once per
+# input instead of being copied per beam. For self-attention, the current step's own key/value come
+# separately and their score is appended to the cached ones, so the cache is read in place rather
+# than concatenated into a new tensor every step.
+def attend(attention, hidden_states, key, value, bias, step_key=None, step_value=None):
+    query = split_heads(attention, attention.q(hidden_states))
+    rows, heads, length, d_kv = query.shape
+    query = query.reshape(key.shape[0], -1, heads, length, d_kv).transpose(1, 2).reshape(key.shape[0], heads, -1, d_kv)
+    scores = torch.matmul(query, key.transpose(-1, -2))
+    if step_key is None:
+        weights = torch.softmax((scores + bias).float(), dim=-1).type_as(scores)
+        output = torch.matmul(weights, value)
+    else:
+        scores = torch.cat([scores, torch.matmul(query, step_key.transpose(-1, -2))], dim=-1)
+        weights = torch.softmax((scores + bias).float(), dim=-1).type_as(scores)
+        past_length = key.shape[2]
+        output = torch.matmul(weights[..., :past_length], value) + torch.matmul(weights[..., past_length:], step_value)
+    output = output.reshape(key.shape[0], heads, -1, length, d_kv).transpose(1, 2).reshape(rows, heads, length, d_kv).transpose(1, 2)
+    return attention.o(output.reshape(rows, -1, attention.inner_dim))
+
+# Runs the encoder and projects its output to every decoder layer's cross-attention keys/values.
+# Output cross_key_values: (layers, 2, batch, heads, source length, d_kv), computed once per input
+# and shared by all of its beams.
+class EncoderGraph(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.encoder = model.encoder
+        self.decoder = model.decoder
+
+    def forward(self, input_ids, attention_mask):
+        hidden_states = self.encoder(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+        cross_key_values = []
+        for block in self.decoder.block:
+            attention = block.layer[1].EncDecAttention
+            cross_key_values.append(torch.stack([split_heads(attention, attention.k(hidden_states)), split_heads(attention, attention.v(hidden_states))]))
+        return torch.stack(cross_key_values)
+
+# One decoding step: the last generated token plus the self-attention keys/values of the previous
+# steps (past length 0 on the first step) in, next-token logits and this step's keys/values
+# (layers, 2, batch, heads, 1, d_kv) out; the caller appends them to its cache.
+# cross_key_values and encoder_attention_mask have one row per input; input_ids and the self-attention
+# cache have num_beams rows per input (beams of an input are consecutive, any num_beams works).
+# Written out layer by layer instead of calling T5Stack so the cache is a plain tensor in the graph.
+class DecoderWithPastGraph(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.decoder = model.decoder
+        self.lm_head = model.lm_head
+        self.config = model.config
+
+    def position_bias(self, past_length):
+        attention = self.decoder.block[0].layer[0].SelfAttention
+        # The query is at position past_length; keys are at 0..past_length
+        relative_position = torch.arange(past_length + 1) - past_length
+        buckets = T5Attention._relative_position_bucket(
+            relative_position,
+            bidirectional=False,
+            num_buckets=self.config.relative_attention_num_buckets,
+            max_distance=self.config.relative_attention_max_distance,
+        )
+        return attention.relative_attention_bias(buckets).transpose(0, 1)[None, :, None, :]
+
+    def forward(self, input_ids, encoder_attention_mask, cross_key_values, past_key_values):
+        hidden_states = self.decoder.embed_tokens(input_ids)
+        self_bias = self.position_bias(past_key_values.shape[4])
+        cross_bias = (1.0 - encoder_attention_mask[:, None, None, :].to(hidden_states.dtype)) * torch.finfo(hidden_states.dtype).min
+
+        step_key_values = []
+        for i, block in enumerate(self.decoder.block):
+            self_layer, cross_layer, feed_forward = block.layer
+            attention = self_layer.SelfAttention
+            normed = self_layer.layer_norm(hidden_states)
+            key = split_heads(attention, attention.k(normed))
+            value = split_heads(attention, attention.v(normed))
+            step_key_values.append(torch.stack([key, value]))
+            hidden_states = hidden_states + attend(attention, normed, past_key_values[i, 0], past_key_values[i, 1], self_bias, key, value)
+
+            normed = cross_layer.layer_norm(hidden_states)
+            hidden_states = hidden_states + attend(cross_layer.EncDecAttention, normed, cross_key_values[i, 0], cross_key_values[i, 1], cross_bias)
+            hidden_states = feed_forward(hidden_states)
+
+        hidden_states = self.decoder.final_layer_norm(hidden_states)
+        if self.config.tie_word_embeddings:
+            hidden_states = hidden_states * self.config.d_model ** -0.5
+        return self.lm_head(hidden_states)[:, -1], torch.stack(step_key_values)
+
+# Writes encoder.onnx and decoder_with_past.onnx plus the config and tokenizer to output_dir,
+# so onnx_backend.OnnxDescriptionGenerator can run from that directory alone
+def export_onnx(model_name, weights_path, output_dir):
+    model = load_model(model_name, weights_path, device=torch.device("cpu")).eval()
+    config = model.config
+    os.makedirs(output_dir, exist_ok=True)
+
+    batch_size, source_length, past_length = 2, 5, 3
+    input_ids = torch.ones(batch_size, source_length, dtype=torch.long)
+    attention_mask = torch.ones(batch_size, source_length, dtype=torch.long)
+    with torch.no_grad():
+        encoder = EncoderGraph(model)
+        torch.onnx.export(
+            encoder,
+            (input_ids, attention_mask),
+            os.path.join(output_dir, ENCODER_FILE),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["cross_key_values"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "source_length"},
+                "attention_mask": {0: "batch", 1: "source_length"},
+                "cross_key_values": {2: "batch", 4: "source_length"},
+            },
+            opset_version=OPSET_VERSION,
+            dynamo=False,
+        )
+
+        cross_key_values = encoder(input_ids, attention_mask)
+        past_key_values = torch.zeros(config.num_decoder_layers, 2, batch_size, config.num_heads, past_length, config.d_kv)
+        # Two beams per input, so the exported graph doesn't assume one
+        decoder_input_ids = input_ids[:, :1].repeat_interleave(2, dim=0)
+        past_key_values = past_key_values.repeat_interleave(2, dim=2)
+        torch.onnx.export(
+            DecoderWithPastGraph(model),
+            (decoder_input_ids, attention_mask, cross_key_values, past_key_values),
+            os.path.join(output_dir, DECODER_FILE),
+            input_names=["input_ids", "encoder_attention_mask", "cross_key_values", "past_key_values"],
+            output_names=["logits", "step_key_values"],
+            dynamic_axes={
+                "input_ids": {0: "batch"},
+                "encoder_attention_mask": {0: SOURCE_BATCH, 1: "source_length"},
+                "cross_key_values": {2: SOURCE_BATCH, 4: "source_length"},
+                "past_key_values": {2: "batch", 4: "past_length"},
+                "logits": {0: "batch"},
+                "step_key_values": {2: "batch"},
+            },
+            opset_version=OPSET_VERSION,
+            dynamo=False,
+        )
+
+    config.save_pretrained(output_dir)
+    load_tokenizer(model_name).save_pretrained(output_dir)
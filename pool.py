@@ -0,0 +1,76 @@
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from inference import BATCH_SIZE, MODEL_NAME, DescriptionGenerator, decoding_options, default_model_path, quantized_model_path
+
+# torch threads per worker process; workers default to the available cores divided by this
+THREADS_PER_WORKER = 4
+
+# Cores this process may run on (the affinity mask, which containers and taskset restrict)
+def available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+_worker_generator = None
+
+def init_worker(threads, generator_kwargs):
+    global _worker_generator
+    # Parallelism comes from the processes; keep each one to its share of the cores
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    import torch
+
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    _worker_generator = DescriptionGenerator(device=torch.device("cpu"), **generator_kwargs)
+
+def generate_chunk(input_texts, decoding):
+    return _worker_generator.generate_batch(input_texts, len(input_texts), decoding=decoding)
+
+# Bulk CPU inference on several worker processes, each running its own generate() with a few torch
+# threads, which uses a many-core machine better than one process with many threads. Workers load
+# the safetensors export, which is memory-mapped: the page cache holds a single copy of the weights
+# shared by every worker, so memory grows only by each worker's activations and runtime. Int8
+# weights (quantized=True) can't be mapped and are loaded once per worker, at a quarter the size.
+# Same generate()/generate_batch() interface as inference.DescriptionGenerator; call close() when done.
+class DescriptionPool:
+    def __init__(self, workers=None, threads_per_worker=None, model_path=None, model_name=MODEL_NAME, quantized=False, decoding=None):
+        model_path = quantized_model_path(model_path) if quantized else model_path or default_model_path()
+        if not quantized and not model_path.endswith(".safetensors"):
+            raise ValueError(f"{model_path}: the worker pool shares memory-mapped safetensors weights; convert them with `python3 export.py safetensors`")
+        cpus = available_cpus()
+        self.workers = workers or max(1, cpus // (threads_per_worker or THREADS_PER_WORKER))
+        self.threads_per_worker = threads_per_worker or max(1, cpus // self.workers)
+        self.decoding = decoding or decoding_options()
+        generator_kwargs = {"model_path": model_path, "model_name": model_name, "quantized": quantized, "decoding": self.decoding}
+        # spawn, not fork: forking a process that already runs torch threads can deadlock the workers
+        self.executor = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(self.threads_per_worker, generator_kwargs),
+        )
+
+    def generate(self, input_text):
+        return self.generate_batch([input_text])[0]
+
+    # Inputs are sorted by length and cut into chunks of at most batch_size, small enough that
+    # every worker gets one; results come back in input order
+    def generate_batch(self, input_texts, batch_size=BATCH_SIZE, decoding=None):
+        input_texts = list(input_texts)
+        if not input_texts:
+            return []
+        order = sorted(range(len(input_texts)), key=lambda i: len(input_texts[i]))
+        chunk_size = min(batch_size, math.ceil(len(order) / self.workers))
+        chunks = [order[start:start + chunk_size] for start in range(0, len(order), chunk_size)]
+        descriptions = [None] * len(input_texts)
+        results = self.executor.map(generate_chunk, [[input_texts[i] for i in chunk] for chunk in chunks], [decoding or self.decoding] * len(chunks))
+        for chunk, chunk_descriptions in zip(chunks, results):
+            for i, description in zip(chunk, chunk_descriptions):
+                descriptions[i] = description
+        return descriptions
+
+    def close(self):
+        self.executor.shutdown()
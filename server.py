@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from batching import MAX_BATCH_SIZE, MAX_WAIT_MS, BackgroundBatcher
+from inference import CACHE_PATH, CACHE_SIZE, add_decoding_arguments, decoding_from_args, make_generator
+
+# Answers POST /generate with {"tags": "..."} or {"tags": ["...", ...]} using the server's warm generator.
+# Requests go through the server's micro-batcher, so concurrent ones share generate_batch() calls.
+class DescriptionRequestHandler(BaseHTTPRequestHandler):
+    server_version = "TagsToDescription/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.send_json(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            cache = getattr(self.server.generator, "cache", None)
+            self.send_json(200, {"cache": cache.stats() if cache else None, "batching": self.server.batcher.stats()})
+        else:
+            self.send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/generate":
+            self.send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length))
+            tags = payload["tags"]
+            if not isinstance(tags, str) and not (isinstance(tags, list) and all(isinstance(t, str) for t in tags)):
+                raise TypeError(tags)
+        except (ValueError, KeyError, TypeError):
+            self.send_json(400, {"error": 'expected a JSON body like {"tags": "1girl, blue hair"} or {"tags": [...]}'})
+            return
+        # A failed batch fails each of its requests; answer them instead of dropping the connection
+        try:
+            if isinstance(tags, list):
+                body = {"tags": tags, "descriptions": self.server.batcher.generate_batch(tags)}
+            else:
+                body = {"tags": tags, "description": self.server.batcher.generate(tags)}
+        except Exception as error:
+            self.log_error("generation failed: %r", error)
+            self.send_json(500, {"error": f"generation failed: {error}"})
+            return
+        self.send_json(200, body)
+
+    def send_json(self, status, body):
+        encoded = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) pair
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return "unix"
+
+# Same HTTP protocol as the TCP server, served over a local Unix domain socket
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        super().server_bind()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+def make_server(generator, host="127.0.0.1", port=8000, unix_socket=None, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+    if unix_socket:
+        server = UnixHTTPServer(unix_socket, DescriptionRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), DescriptionRequestHandler)
+    server.generator = generator
+    # Requests are queued and run in batches, one batch at a time, so they never fight over the model;
+    # call server.batcher.close() after server_close()
+    server.batcher = BackgroundBatcher(generator, max_batch_size, max_wait_ms)
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve tag-to-description generation over HTTP")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="TCP port to listen on")
+    parser.add_argument("--unix-socket", type=str, default=None, help="Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--model-path", type=str, default=None, help="Fine-tuned model weights (.pth, .safetensors or .int8.pt)")
+    parser.add_argument("--quantized", action="store_true", help="Serve the int8 CPU model (see export.py quantized)")
+    parser.add_argument("--onnx", action="store_true", help="Serve the ONNX Runtime export (see export.py onnx)")
+    parser.add_argument("--shared-kv", action="store_true", help="CPU engine that computes encoder states once per input for all beams (see shared_kv.py)")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="Descriptions cached in memory by tag set (0 disables)")
+    parser.add_argument("--cache-path", type=str, default=CACHE_PATH, help="SQLite file that keeps cached descriptions across restarts")
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE, help="Most concurrent requests generated together (1 disables batching)")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS, help="How long a request waits for others to share its batch")
+    add_decoding_arguments(parser)
+
+    args = parser.parse_args()
+
+    generator = make_generator(quantized=args.quantized, onnx=args.onnx, model_path=args.model_path, decoding=decoding_from_args(args), cache_size=args.cache_size, cache_path=args.cache_path, shared_kv=args.shared_kv)
+    server = make_server(generator, host=args.host, port=args.port, unix_socket=args.unix_socket, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    print(f"Serving on {args.unix_socket or f'http://{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.close()
@@ -0,0 +1,40 @@
+import torch
+
+from inference import MODEL_NAME, decoding_options, default_model_path, quantized_model_path
+from modeling import load_model, load_tokenizer
+from onnx_backend import OnnxDescriptionGenerator, check_decoding
+from onnx_export import DecoderWithPastGraph, EncoderGraph
+
+# Runs one of the onnx_export graph modules eagerly with the InferenceSession.run() interface, numpy
+# arrays in and out (shared memory on CPU, no copies)
+class TorchSession:
+    def __init__(self, module, input_names):
+        self.module = module
+        self.input_names = input_names
+
+    def run(self, output_names, feeds):
+        with torch.inference_mode():
+            outputs = self.module(*(torch.from_numpy(feeds[name]) for name in self.input_names))
+        return [output.numpy() for output in (outputs if isinstance(outputs, tuple) else (outputs,))]
+
+# PyTorch inference that runs the encoder and the cross-attention key/value projections once per
+# distinct input, which all of that input's beams then share. model.generate() instead repeats the
+# encoder output for every beam, projects it to keys/values in every beam's row and reorders that
+# copy on every step. Reuses the ONNX backend's search loops with the same graphs run eagerly, so
+# nothing has to be exported first and fp32, safetensors and int8 weights all work. CPU only; no
+# sampling. Same generate()/generate_batch() interface as inference.DescriptionGenerator.
+class SharedKVDescriptionGenerator(OnnxDescriptionGenerator):
+    def __init__(self, model_path=None, model_name=MODEL_NAME, model=None, tokenizer=None, quantized=False, decoding=None):
+        decoding = decoding or decoding_options()
+        check_decoding(decoding)
+        if model is None:
+            model_path = quantized_model_path(model_path) if quantized else model_path or default_model_path()
+            model = load_model(model_name, weights_path=model_path, device=torch.device("cpu"))
+        model.eval()
+        self.encoder = TorchSession(EncoderGraph(model), ["input_ids", "attention_mask"])
+        self.decoder = TorchSession(DecoderWithPastGraph(model), ["input_ids", "encoder_attention_mask", "cross_key_values", "past_key_values"])
+        self.tokenizer = tokenizer or load_tokenizer(model_name)
+        self.decoder_start_token_id = model.config.decoder_start_token_id
+        self.eos_token_id = model.config.eos_token_id
+        self.pad_token_id = model.config.pad_token_id
+        self.decoding = decoding
@@ -0,0 +1,104 @@
+import contextlib
+import os
+import time
+
+# Timed phases of a training step, in order; time outside them (loss logging, checkpoints) is "other"
+PHASES = ["data", "copy", "forward", "backward", "optimizer"]
+
+# Wall-clock time per phase of the training loop, plus the examples and tokens it went through, for
+# a per-epoch summary. "data" is the host waiting on the DataLoader. CUDA work is queued
+# asynchronously, so by default the copy/forward/backward/optimizer phases on a GPU only measure
+# queueing, and the wait lands in whichever later phase synchronizes. synchronize=True makes each
+# phase wait for the device before its clock stops: exact, but copies no longer overlap compute.
+# On CPU every phase is exact either way. With a torch.profiler profile the phases also show up
+# as labelled ranges in its trace, and step() advances its schedule.
+class StepTimer:
+    def __init__(self, device=None, synchronize=False, profiler=None):
+        self.synchronize = synchronize and device is not None and device.type == "cuda"
+        self.profiler = profiler
+        self.reset()
+
+    def reset(self):
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.steps = 0
+        self.examples = 0
+        self.tokens = 0
+        self.start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        with self.record(name):
+            yield
+            if self.synchronize:
+                import torch
+
+                torch.cuda.synchronize()
+        self.seconds[name] += time.perf_counter() - start
+
+    def record(self, name):
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        from torch.profiler import record_function
+
+        return record_function(name)
+
+    # Iterates over dataloader, timing every wait for the next batch (worker start-up included)
+    def batches(self, dataloader):
+        with self.phase("data"):
+            iterator = iter(dataloader)
+        while True:
+            with self.phase("data"):
+                batch = next(iterator, None)
+            if batch is None:
+                return
+            yield batch
+
+    # Call once per batch; tokens are the non-padding input and label tokens
+    def step(self, examples, tokens):
+        self.steps += 1
+        self.examples += examples
+        self.tokens += tokens
+        if self.profiler is not None:
+            self.profiler.step()
+
+    def summary(self):
+        seconds = time.perf_counter() - self.start
+        phases = dict(self.seconds, other=max(0.0, seconds - sum(self.seconds.values())))
+        return {
+            "steps": self.steps,
+            "examples": self.examples,
+            "tokens": self.tokens,
+            "seconds": seconds,
+            "examples_per_second": self.examples / seconds,
+            "tokens_per_second": self.tokens / seconds,
+            "data_loading_fraction": self.seconds["data"] / seconds,
+            "phase_seconds": phases,
+        }
+
+def format_summary(summary):
+    phases = ", ".join(f"{name} {seconds / summary['seconds']:.1%}" for name, seconds in summary["phase_seconds"].items())
+    return (
+        f"{summary['tokens_per_second']:.0f} tokens/sec, {summary['examples_per_second']:.1f} examples/sec, "
+        f"{summary['data_loading_fraction']:.1%} of the time in data loading ({phases})"
+    )
+
+# torch.profiler profile that skips `wait` steps, warms up for `warmup` and records the `active`
+# steps after that, then writes a Chrome trace (chrome://tracing or ui.perfetto.dev) to trace_dir.
+# Start it before the first step and stop it at the end; StepTimer(profiler=...) steps it.
+def make_profiler(trace_dir, wait=5, warmup=2, active=5):
+    import torch
+    from torch.profiler import ProfilerActivity, profile, schedule
+
+    activities = [ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(ProfilerActivity.CUDA)
+
+    def export(profiler):
+        os.makedirs(trace_dir, exist_ok=True)
+        path = os.path.join(trace_dir, f"trace-step{profiler.step_num}.json")
+        profiler.export_chrome_trace(path)
+        print(f"Wrote profiler trace {path}")
+
+    return profile(activities=activities, schedule=schedule(wait=wait, warmup=warmup, active=active, repeat=1),
+                   on_trace_ready=export, record_shapes=True, profile_memory=True)
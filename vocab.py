@@ -0,0 +1,78 @@
+import collections
+import itertools
+import os
+
+import numpy as np
+
+# Tag strings <-> integer ids, with how often each tag occurs. Tags are kept as one UTF-8 byte array
+# plus offsets and the counts as an int64 array, so even a large vocabulary is three numpy arrays
+# (saved as .npy, memory-mapped on load) rather than a Python object per tag; the tag -> id dict is
+# only built the first time something is encoded. Ids are assigned by descending frequency.
+# Input tag strings are expected to be normalized (see normalize.py): tags separated by ", ".
+class TagVocabulary:
+    def __init__(self, data, offsets, counts):
+        self.data = data
+        self.offsets = offsets
+        self.counts = counts
+        self.index = None
+
+    @classmethod
+    def build(cls, tag_strings):
+        counts = collections.Counter(itertools.chain.from_iterable(split_tags(tags) for tags in tag_strings))
+        tags = sorted(counts, key=lambda tag: (-counts[tag], tag))
+        encoded = [tag.encode("utf-8") for tag in tags]
+        offsets = np.zeros(len(tags) + 1, dtype=np.int64)
+        np.cumsum([len(tag) for tag in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(data, offsets, np.array([counts[tag] for tag in tags], dtype=np.int64))
+
+    @classmethod
+    def load(cls, path):
+        return cls(*(np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in ("tags", "tag_offsets", "tag_counts")))
+
+    def save(self, path):
+        for name, array in (("tags", self.data), ("tag_offsets", self.offsets), ("tag_counts", self.counts)):
+            np.save(os.path.join(path, f"{name}.npy"), array)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, tag_id):
+        return bytes(self.data[self.offsets[tag_id]:self.offsets[tag_id + 1]]).decode("utf-8")
+
+    def id(self, tag):
+        if self.index is None:
+            self.index = {self[tag_id]: tag_id for tag_id in range(len(self))}
+        return self.index[tag]
+
+    # Smallest integer type that holds every id, for storing encoded examples
+    def dtype(self):
+        return np.uint16 if len(self) <= np.iinfo(np.uint16).max + 1 else np.int32
+
+    def encode(self, tags):
+        return np.array([self.id(tag) for tag in split_tags(tags)], dtype=self.dtype())
+
+    def decode(self, tag_ids):
+        return ", ".join(self[tag_id] for tag_id in tag_ids)
+
+    # Order- and duplicate-free form of an encoded tag string; equal for any permutation of the tags
+    @staticmethod
+    def canonical(tag_ids):
+        return np.unique(tag_ids)
+
+    def most_common(self, n=None):
+        return [(self[tag_id], int(self.counts[tag_id])) for tag_id in range(len(self) if n is None else min(n, len(self)))]
+
+def split_tags(tags):
+    return [tag for tag in (tag.strip() for tag in tags.split(",")) if tag]
+
+# Drops repeated examples: same tag set (in any order) and same description. Keeps the first one.
+def deduplicate(pairs, vocabulary):
+    seen = set()
+    unique = []
+    for tags, description in pairs:
+        key = (vocabulary.canonical(vocabulary.encode(tags)).tobytes(), description)
+        if key not in seen:
+            seen.add(key)
+            unique.append((tags, description))
+    return unique